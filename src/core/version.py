@@ -1,26 +1,85 @@
+import os
+import re
+import sys
+import time
 import requests
 import json
-from packaging import version
+import threading
+from PyQt6.QtCore import QObject, pyqtSignal
 
 CURRENT_VERSION = "2.1.2"
 GITHUB_REPO = "bbqqvv/VNNotes-AnonymNotes"
+UPDATE_CACHE_TTL = 24 * 60 * 60 # Seconds before the cached release info is re-validated
 
-def check_for_updates():
+_VERSION_RE = re.compile(r'\d+(?:\.\d+)*')
+
+def _parse_version(v):
+    """'2.1.2' / 'v2.2.0-beta' -> (2, 1, 2) / (2, 2, 0); pre-release suffixes are ignored."""
+    match = _VERSION_RE.search(v)
+    return tuple(int(x) for x in match.group().split('.')) if match else ()
+
+def _update_cache_path():
+    """Location of the cached release check (same app data root as the logs)."""
+    if sys.platform == 'win32':
+        base_dir = os.path.join(os.getenv('APPDATA') or os.path.expanduser('~'), "VNNotes")
+    else:
+        base_dir = os.path.expanduser('~/.vnnotes')
+    return os.path.join(base_dir, "update_check.json")
+
+def _load_update_cache():
+    try:
+        with open(_update_cache_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_update_cache(cache):
+    try:
+        path = _update_cache_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+    except OSError:
+        pass # Cache is best-effort; the next check simply goes to the network
+
+def check_for_updates(use_cache=True):
     """
     Check GitHub for latest release.
+    Uses a conditional request (ETag) and, when use_cache is set, skips the
+    network entirely if the release info was validated within UPDATE_CACHE_TTL.
     Returns: (has_update: bool, latest_version: str, download_url: str, error: str)
     """
     try:
-        url = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
-        response = requests.get(url, timeout=5)
-        
-        if response.status_code == 404:
-             return False, CURRENT_VERSION, "", "Release not found (Repo private or no releases?)"
-        
-        if response.status_code != 200:
-            return False, CURRENT_VERSION, "", f"API Error: {response.status_code}"
+        cache = _load_update_cache()
+        fresh = time.time() - cache.get("timestamp", 0) < UPDATE_CACHE_TTL
+
+        if use_cache and fresh and cache.get("tag_name"):
+            data = cache
+        else:
+            url = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
+            headers = {}
+            if cache.get("etag") and cache.get("tag_name"):
+                headers["If-None-Match"] = cache["etag"]
+            response = requests.get(url, timeout=5, headers=headers)
+            
+            if response.status_code == 404:
+                 return False, CURRENT_VERSION, "", "Release not found (Repo private or no releases?)"
+            
+            if response.status_code == 304:
+                # Unchanged since last check: reuse the cached release info
+                data = cache
+            elif response.status_code != 200:
+                return False, CURRENT_VERSION, "", f"API Error: {response.status_code}"
+            else:
+                data = response.json()
+                cache = {
+                    "etag": response.headers.get("ETag", ""),
+                    "tag_name": data.get("tag_name", ""),
+                    "html_url": data.get("html_url", ""),
+                }
+            cache["timestamp"] = time.time()
+            _save_update_cache(cache)
         
-        data = response.json()
         latest_version = data.get("tag_name", "").lstrip("v")
         download_url = data.get("html_url", "")
         
@@ -28,9 +87,38 @@ def check_for_updates():
             return False, CURRENT_VERSION, "", "No version found"
         
         # Compare versions
-        has_update = version.parse(latest_version) > version.parse(CURRENT_VERSION)
+        has_update = _parse_version(latest_version) > _parse_version(CURRENT_VERSION)
         
         return has_update, latest_version, download_url, ""
         
     except Exception as e:
         return False, CURRENT_VERSION, "", str(e)
+
+class _UpdateCheckRelay(QObject):
+    """Carries a background check result back to the thread that started it."""
+    finished = pyqtSignal(tuple)
+
+    def __init__(self, callback):
+        super().__init__()
+        self._callback = callback
+        self.finished.connect(self._deliver)
+
+    def _deliver(self, result):
+        _pending_checks.discard(self)
+        self._callback(*result)
+
+_pending_checks = set() # Keeps relays alive until their result is delivered
+
+def check_for_updates_async(callback, use_cache=True):
+    """
+    Non-blocking variant of check_for_updates for the GUI thread.
+    The request runs on a daemon thread; callback(has_update, latest_version,
+    download_url, error) is invoked on the calling (GUI) thread.
+    """
+    relay = _UpdateCheckRelay(callback)
+    _pending_checks.add(relay)
+
+    def worker():
+        relay.finished.emit(check_for_updates(use_cache=use_cache))
+
+    threading.Thread(target=worker, daemon=True).start()
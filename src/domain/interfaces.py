@@ -1,12 +1,26 @@
-﻿from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
-from .models import Note, Folder
+﻿from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, ContextManager, Iterator
+
+if TYPE_CHECKING: # Annotation-only; keeps the interface module import-light
+    from .models import Note, Folder
 
 class IStorage(ABC):
     """Abstract Base Class for all storage implementations."""
 
     @abstractmethod
-    def get_all_notes(self, only_open: bool = False, include_placeholders: bool = False) -> List[Note]:
+    def transaction(self) -> ContextManager[Any]:
+        pass
+
+    @abstractmethod
+    def get_all_notes(self, only_open: bool = False, include_placeholders: bool = False,
+                      limit: Optional[int] = None, offset: int = 0) -> List[Note]:
+        pass
+
+    @abstractmethod
+    def iter_all_notes(self, only_open: bool = False, include_placeholders: bool = False,
+                       batch_size: int = 256) -> Iterator[Note]:
         pass
 
     @abstractmethod
@@ -17,10 +31,18 @@ class IStorage(ABC):
     def upsert_note_metadata(self, note: Note) -> bool:
         pass
 
+    @abstractmethod
+    def upsert_notes_metadata_bulk(self, notes: List[Note]) -> bool:
+        pass
+
     @abstractmethod
     def save_note_content(self, obj_name: str, content: str) -> bool:
         pass
 
+    @abstractmethod
+    def save_note_contents_bulk(self, items: List[tuple]) -> bool:
+        pass
+
     @abstractmethod
     def load_note_content(self, obj_name: str) -> str:
         pass
@@ -29,6 +51,10 @@ class IStorage(ABC):
     def delete_note(self, obj_name: str) -> bool:
         pass
 
+    @abstractmethod
+    def delete_notes_in_folder(self, folder_name: str) -> List[str]:
+        pass
+
     @abstractmethod
     def get_folders(self) -> List[Folder]:
         pass
@@ -61,6 +87,14 @@ class IStorage(ABC):
     def delete_all_browsers(self) -> bool:
         pass
 
+    @abstractmethod
+    def delete_browsers(self, obj_names: List[str]) -> bool:
+        pass
+
     @abstractmethod
     def upsert_browser_metadata(self, browser: Dict[str, Any]) -> bool:
         pass
+
+    @abstractmethod
+    def bulk_insert_browsers(self, rows: List[tuple]) -> bool:
+        pass
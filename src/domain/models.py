@@ -1,8 +1,12 @@
-﻿from dataclasses import dataclass, field
-from datetime import datetime
-from typing import List, Optional
+﻿from __future__ import annotations
 
-@dataclass
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+@dataclass(slots=True)
 class Note:
     """Type-safe model for a Note entity."""
     obj_name: str
@@ -45,6 +49,19 @@ class Note:
             content=data.get("content")
         )
 
+    @classmethod
+    def from_row(cls, row):
+        """
+        Builds a Note straight from a storage row, read by position
+        (obj_name, title, folder, pinned, is_open, is_locked, is_placeholder,
+        password_hash, position) without an intermediate dict.
+        """
+        return cls(
+            row[0], row[1] or "", row[2],
+            bool(row[3]), bool(row[4]), bool(row[5]), bool(row[6]),
+            row[7], position=int(row[8] or 0)
+        )
+
     def to_dict(self):
         """Converts model back to dictionary for legacy compatibility or storage."""
         return {
@@ -59,7 +76,7 @@ class Note:
             "position": self.position
         }
 
-@dataclass
+@dataclass(slots=True)
 class Folder:
     """Type-safe model for a Folder entity."""
     name: str
@@ -9,11 +9,13 @@ class BrowserService:
     def __init__(self, storage_manager=None):
         self.storage = storage_manager or StorageManager()
         self._browsers = [] # Internal list of browser session dicts
+        self._persisted = {} # obj_name -> (title, url) as last written to storage
         self._is_loaded = False # Integrity guard
 
     def load_browsers(self):
         """Loads browser state from SQLite via StorageManager."""
         self._browsers = self.storage.get_all_browsers()
+        self._persisted = {b["obj_name"]: (b["title"], b["url"]) for b in self._browsers}
         self._is_loaded = True
         return self._browsers
 
@@ -55,16 +57,34 @@ class BrowserService:
     def sync_to_storage(self, current_browser_data):
         """
         Replaces current browser list with UI state and saves to SQLite.
-        Atomic per-sync.
+        Only rows that differ from the last persisted state are written,
+        all inside one transaction.
         """
         if not self._is_loaded:
              return False
-             
-        # Plan v8.1 fix: Clear and repopulate
-        self.storage.delete_all_browsers()
-        for browser in current_browser_data:
-            self.storage.upsert_browser_metadata(browser)
+
+        current = {
+            b["obj_name"]: (b.get("title", "Mini Browser"), b.get("url", "https://google.com"))
+            for b in current_browser_data
+        }
+        removed = [name for name in self._persisted if name not in current]
+        changed = [
+            (name, title, url) for name, (title, url) in current.items()
+            if self._persisted.get(name) != (title, url)
+        ]
+
+        if removed or changed:
+            try:
+                with self.storage.transaction():
+                    if removed:
+                        self.storage.delete_browsers(removed)
+                    if changed:
+                        self.storage.bulk_insert_browsers(changed)
+            except Exception as e:
+                logging.error(f"BrowserService.sync_to_storage Error: {e}")
+                return False # Keep the old snapshot so the next sync retries
             
+        self._persisted = current
         self._browsers = current_browser_data
         return True
 
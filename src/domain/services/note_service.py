@@ -1,10 +1,28 @@
-﻿import logging
+﻿import hashlib
+import hmac
+import logging
 import re
+from collections import Counter
 from typing import List, Optional, Dict, Any
 from src.domain.interfaces import IStorage
 from src.domain.models import Note, Folder
 from src.infrastructure.storage import StorageManager
 
+_INTERNAL_LINK_RE = re.compile(r'href=["\']vnnote://(NoteDock_\d+)["\']')
+_TITLE_SUFFIX_RE = re.compile(r" \((\d+)\)$") # "Title (2)" -> 2
+
+def _pwd_hash(salt: str, password: str) -> str:
+    """BLAKE2b over the full note/folder name and the password (NUL-separated)."""
+    return hashlib.blake2b(salt.encode() + b'\0' + password.encode(), digest_size=32).hexdigest()
+
+def _pwd_matches(salt: str, password: str, stored: Optional[str]) -> bool:
+    """Checks a password against a stored hash, accepting the legacy sha256(name + password) format."""
+    if not stored: return False
+    if hmac.compare_digest(_pwd_hash(salt, password), stored):
+        return True
+    legacy = hashlib.sha256(salt.encode() + password.encode()).hexdigest()
+    return hmac.compare_digest(legacy, stored)
+
 class NoteService:
     """
     Service layer for managing Note data logic.
@@ -13,7 +31,15 @@ class NoteService:
     def __init__(self, storage_manager: Optional[IStorage] = None):
         self.storage = storage_manager or StorageManager()
         self._notes: List[Note] = [] # Cache of Note models
+        self._notes_by_obj: Dict[str, Note] = {} # obj_name -> Note index over _notes
         self._folders: List[Folder] = [] # Cache of Folder models
+        self._folders_by_name: Dict[str, Folder] = {}
+        self._notes_by_folder: Dict[str, List[Note]] = {} # folder name -> notes, in _notes order
+        self._pinned: List[Note] = []
+        self._titles_by_folder: Dict[str, Counter] = {} # stripped folder -> Counter of lowered titles
+        self._sorted_folder_names: Optional[List[str]] = None
+        self._max_note_id = 0 # Highest N among cached "NoteDock_N" names
+        self._max_position = 0
         self._is_loaded = False
 
     def load_notes(self) -> List[Note]:
@@ -21,58 +47,97 @@ class NoteService:
         Loads notes and folders from storage. 
         Returns ONLY open notes for session restoration.
         """
-        self._notes = self.storage.get_all_notes(only_open=False)
-        self._folders = self.storage.get_folders()
+        self._set_notes(self.storage.get_all_notes(only_open=False))
+        self._set_folders(self.storage.get_folders())
         
         if not self._notes:
             default_note_data = self.create_default_note_data()
             default_note = Note.from_dict(default_note_data)
             self.storage.upsert_note_metadata(default_note)
             self.storage.save_note_content(default_note.obj_name, default_note_data.pop("content"))
-            self._notes = self.storage.get_all_notes(only_open=False)
-            self._folders = self.storage.get_folders()
+            self._set_notes(self.storage.get_all_notes(only_open=False))
+            self._set_folders(self.storage.get_folders())
             
         self._is_loaded = True
         return [n for n in self._notes if n.is_open]
 
+    def _set_notes(self, notes: List[Note]):
+        """Replaces the note cache and rebuilds its lookup indexes in a single pass."""
+        self._notes = notes
+        self._notes_by_obj = {}
+        self._notes_by_folder = {}
+        self._pinned = []
+        self._titles_by_folder = {}
+        self._max_note_id = 0
+        self._max_position = 0
+        for n in notes:
+            self._index_note(n)
+
+    def _index_note(self, note: Note):
+        self._notes_by_obj[note.obj_name] = note
+        self._notes_by_folder.setdefault(note.folder, []).append(note)
+        if note.pinned:
+            self._pinned.append(note)
+        self._count_title(note, 1)
+        if note.position > self._max_position:
+            self._max_position = note.position
+        if note.obj_name.startswith("NoteDock_"):
+            tail = note.obj_name[9:] # len("NoteDock_")
+            if tail.isdigit():
+                nid = int(tail)
+                if nid > self._max_note_id: self._max_note_id = nid
+
+    def _unindex_note(self, note: Note):
+        self._notes_by_obj.pop(note.obj_name, None)
+        folder_notes = self._notes_by_folder.get(note.folder)
+        if folder_notes is not None:
+            folder_notes.remove(note)
+            if not folder_notes:
+                del self._notes_by_folder[note.folder]
+        if note.pinned:
+            self._pinned.remove(note)
+        self._count_title(note, -1)
+
+    def _count_title(self, note: Note, delta: int):
+        """Adds/removes a note's title in the per-folder uniqueness index."""
+        if note.is_placeholder: return
+        titles = self._titles_by_folder.setdefault((note.folder or "").strip(), Counter())
+        titles[(note.title or "").lower().strip()] += delta
+
+    def _save_note(self, note: Note) -> bool:
+        """Persists one in-place edited note; on failure reloads so the cache matches storage."""
+        if self.storage.upsert_note_metadata(note):
+            return True
+        self._set_notes(self.storage.get_all_notes())
+        return False
+
+    def _set_folders(self, folders: List[Folder]):
+        """Replaces the folder cache and its name index."""
+        self._folders = folders
+        self._folders_by_name = {f.name: f for f in folders}
+        self._sorted_folder_names = None
+
     def get_notes(self) -> List[Note]:
         return self._notes
 
     def get_pinned_notes(self) -> List[Note]:
         """Returns all notes currently pinned."""
-        return [n for n in self._notes if n.pinned]
+        return list(self._pinned)
 
     def add_note(self, title="New Note", content="", folder="General", pinned=False, is_open=True, is_placeholder=False, is_locked=False) -> Note:
         """Adds a new note entity via the model layer."""
         title = self._get_unique_title(title, folder)
         
-        # Find max ID for local naming and max position
-        max_id = 0
-        max_pos = 0
-        for note in self._notes:
-             # Support both Note objects and legacy dicts if any remain during migration
-             o_name = note.obj_name if hasattr(note, 'obj_name') else note.get("obj_name", "")
-             pos = note.position if hasattr(note, 'position') else note.get("position", 0)
-             
-             if isinstance(o_name, str) and o_name.startswith("NoteDock_"):
-                 try:
-                     nid = int(o_name.split("_")[1])
-                     if nid > max_id: max_id = nid
-                 except (ValueError, IndexError): pass
-             
-             if pos > max_pos:
-                 max_pos = pos
-                       
-        new_id = max_id + 1
+        # Next local id / position come from the counters kept by _index_note
         new_note = Note(
-            obj_name=f"NoteDock_{new_id}",
+            obj_name=f"NoteDock_{self._max_note_id + 1}",
             title=title,
             folder=folder,
             pinned=pinned,
             is_open=is_open,
             is_locked=is_locked,
             is_placeholder=is_placeholder,
-            position=max_pos + 1
+            position=self._max_position + 1
         )
         
         # Persistent storage
@@ -81,31 +146,36 @@ class NoteService:
         
         # Refresh Cache
         self._notes.append(new_note)
-        self._folders = self.storage.get_folders()
+        self._index_note(new_note)
+        if (folder or "General") not in self._folders_by_name: # Upsert just created the folder row
+            self._set_folders(self.storage.get_folders())
         return new_note
 
     def _get_unique_title(self, title: str, folder_name: str, exclude_obj_name: Optional[str] = None) -> str:
         """Ensures title is unique within a folder (Enterprise logic)."""
         target_folder = folder_name.strip() if folder_name else "General"
-        existing_titles = [
-            (n.title or "").lower().strip() for n in self._notes 
-            if (n.folder or "").strip() == target_folder 
-            and n.obj_name != exclude_obj_name
-            and not n.is_placeholder
-        ]
-        
-        if title.lower() not in existing_titles:
+        existing_titles = self._titles_by_folder.get(target_folder, Counter())
+        own_title = None
+        excluded = self._notes_by_obj.get(exclude_obj_name) if exclude_obj_name else None
+        if excluded and not excluded.is_placeholder and (excluded.folder or "").strip() == target_folder:
+            own_title = (excluded.title or "").lower().strip()
+
+        def is_taken(candidate):
+            count = existing_titles.get(candidate, 0)
+            return (count - 1 if candidate == own_title else count) > 0
+
+        if not is_taken(title.lower()):
             return title
             
         base_title = title
         counter = 2
-        match = re.search(r" \((\d+)\)$", title)
+        match = _TITLE_SUFFIX_RE.search(title)
         if match:
             base_title = title[:match.start()]
             counter = int(match.group(1)) + 1
         
         new_title = f"{base_title} ({counter})"
-        while new_title.lower() in existing_titles:
+        while is_taken(new_title.lower()):
             counter += 1
             new_title = f"{base_title} ({counter})"
         return new_title
@@ -113,13 +183,11 @@ class NoteService:
     def sync_to_storage(self, current_notes_data: List[Dict[str, Any]]) -> bool:
         """
         Syncs the current UI state (dicts from QT) into Domain Models and Persistance.
+        All notes are written with bulk statements inside a single transaction.
         """
         if not self._is_loaded: return False
 
-        # Close all first for session sync
-        if hasattr(self.storage, 'set_all_notes_closed'):
-            self.storage.set_all_notes_closed()
-
+        notes, contents, links = [], [], {}
         for ui_note_dict in current_notes_data:
             obj_name = ui_note_dict["obj_name"]
             content = ui_note_dict.pop("content", None)
@@ -137,22 +205,33 @@ class NoteService:
                 note = Note.from_dict(ui_note_dict)
                 note.is_open = True
             
-            self.storage.upsert_note_metadata(note)
+            notes.append(note)
             if content is not None:
-                self.storage.save_note_content(obj_name, content)
+                contents.append((obj_name, content))
                 # Link Graph update
-                target_links = self.extract_internal_links(content)
-                if hasattr(self.storage, 'update_note_links'):
-                    self.storage.update_note_links(obj_name, target_links)
+                links[obj_name] = self.extract_internal_links(content)
+
+        try:
+            with self.storage.transaction():
+                # Close all first for session sync
+                if hasattr(self.storage, 'set_all_notes_closed'):
+                    self.storage.set_all_notes_closed()
+                self.storage.upsert_notes_metadata_bulk(notes)
+                self.storage.save_note_contents_bulk(contents)
+                if hasattr(self.storage, 'update_note_links_bulk'):
+                    self.storage.update_note_links_bulk(links)
+        except Exception as e:
+            logging.error(f"NoteService.sync_to_storage Error: {e}")
+            # The cached models were edited in place above; reload so they match the rolled-back rows
+            self._set_notes(self.storage.get_all_notes())
+            return False
         
-        self._notes = self.storage.get_all_notes()
+        self._set_notes(self.storage.get_all_notes())
         return True
 
     def extract_internal_links(self, html: str) -> List[str]:
         if not html: return []
-        pattern = r'href=["\']vnnote://(NoteDock_\d+)["\']'
-        matches = re.findall(pattern, html)
-        return list(set(matches))
+        return list({m.group(1) for m in _INTERNAL_LINK_RE.finditer(html)})
 
     def get_note_content(self, obj_name: str) -> str:
         return self.storage.load_note_content(obj_name)
@@ -176,7 +255,9 @@ class NoteService:
         }
         
     def get_folders(self) -> List[str]:
-        return sorted([f.name for f in self._folders])
+        if self._sorted_folder_names is None:
+            self._sorted_folder_names = sorted(self._folders_by_name)
+        return list(self._sorted_folder_names)
 
     def move_note(self, note_obj_name: str, new_folder: str) -> bool:
         if self.is_folder_locked(new_folder): return False
@@ -184,9 +265,11 @@ class NoteService:
         note = self.get_note_by_id(note_obj_name)
         if note:
             note.folder = new_folder
-            self.storage.upsert_note_metadata(note)
-            self._notes = self.storage.get_all_notes()
-            self._folders = self.storage.get_folders()
+            if not self._save_note(note): return False
+            # Re-index in memory: the note keeps its place in the ordering, only its bucket changes
+            self._set_notes(self._notes)
+            if new_folder not in self._folders_by_name:
+                self._set_folders(self.storage.get_folders())
             return True
         return False
 
@@ -194,16 +277,19 @@ class NoteService:
         note = self.get_note_by_id(note_obj_name)
         if note:
             new_title = self._get_unique_title(new_title, note.folder, exclude_obj_name=note_obj_name)
+            self._count_title(note, -1)
             note.title = new_title
-            self.storage.upsert_note_metadata(note)
-            self._notes = self.storage.get_all_notes()
-            self._folders = self.storage.get_folders()
+            self._count_title(note, 1)
+            self._save_note(note)
             return new_title
         return None
 
     def delete_note(self, note_obj_name: str) -> bool:
         if self.storage.delete_note(note_obj_name):
-            self._notes = self.storage.get_all_notes()
+            note = self._notes_by_obj.get(note_obj_name)
+            if note:
+                self._unindex_note(note)
+                self._notes.remove(note)
             return True
         return False
 
@@ -211,24 +297,30 @@ class NoteService:
         note = self.get_note_by_id(note_obj_name)
         if note:
             note.pinned = not note.pinned
-            self.storage.upsert_note_metadata(note)
-            self._notes = self.storage.get_all_notes()
+            if self._save_note(note):
+                # Mirror storage's "pinned DESC, position" order; the stable sort keeps id order for ties
+                self._notes.sort(key=lambda n: (not n.pinned, n.position))
+                self._set_notes(self._notes)
             return note.pinned
         return False
 
     def rename_folder(self, old_name: str, new_name: str) -> bool:
         if not new_name or new_name == old_name: return False
         if self.storage.rename_folder(old_name, new_name):
-            self._notes = self.storage.get_all_notes()
-            self._folders = self.storage.get_folders()
+            # Only the renamed folder's notes change: relabel them instead of reloading every note
+            moved = self._notes_by_folder.pop(old_name, [])
+            for note in moved:
+                self._count_title(note, -1)
+                note.folder = new_name
+                self._count_title(note, 1)
+            if moved:
+                self._notes_by_folder[new_name] = moved
+            self._set_folders(self.storage.get_folders())
             return True
         return False
 
     def get_note_by_id(self, note_obj_name: str) -> Optional[Note]:
-        for note in self._notes:
-            if note.obj_name == note_obj_name:
-                return note
-        return None
+        return self._notes_by_obj.get(note_obj_name)
 
     def search_notes(self, query: str) -> List[Dict[str, Any]]:
         results = self.storage.search_notes_fts(query)
@@ -241,59 +333,46 @@ class NoteService:
         return filtered_results
 
     def is_folder_locked(self, folder_name: str) -> bool:
-        for f in self._folders:
-            if f.name == folder_name:
-                return f.is_locked
-        return False
+        f = self._folders_by_name.get(folder_name)
+        return bool(f and f.is_locked)
 
     def lock_folder(self, folder_name: str, password: str) -> bool:
-        import hashlib
-        if folder_name not in self.get_folders(): return False
-        pwd_hash = hashlib.sha256(folder_name.encode() + password.encode()).hexdigest()
+        if folder_name not in self._folders_by_name: return False
+        pwd_hash = _pwd_hash(folder_name, password)
         if self.storage.set_folder_lock(folder_name, True, pwd_hash):
-            self._folders = self.storage.get_folders()
+            self._set_folders(self.storage.get_folders())
             return True
         return False
 
     def unlock_folder(self, folder_name, password: str) -> bool:
-        import hashlib
-        target_f = next((f for f in self._folders if f.name == folder_name), None)
+        target_f = self._folders_by_name.get(folder_name)
         if not target_f or not target_f.is_locked: return False
-        pwd_hash = hashlib.sha256(folder_name.encode() + password.encode()).hexdigest()
-        if pwd_hash == target_f.password_hash:
+        if _pwd_matches(folder_name, password, target_f.password_hash):
             if self.storage.set_folder_lock(folder_name, False):
-                self._folders = self.storage.get_folders()
+                self._set_folders(self.storage.get_folders())
                 return True
         return False
 
     def lock_note(self, obj_name: str, password: str) -> bool:
-        import hashlib
         note = self.get_note_by_id(obj_name)
         if not note: return False
-        pwd_hash = hashlib.sha256(obj_name.encode() + password.encode()).hexdigest()
         note.is_locked = True
-        note.password_hash = pwd_hash
-        self.storage.upsert_note_metadata(note)
-        self._notes = self.storage.get_all_notes()
-        return True
+        note.password_hash = _pwd_hash(obj_name, password)
+        return self._save_note(note)
 
     def unlock_note(self, obj_name: str, password: str) -> bool:
-        import hashlib
         note = self.get_note_by_id(obj_name)
         if not note or not note.is_locked: return False
-        pwd_hash = hashlib.sha256(obj_name.encode() + password.encode()).hexdigest()
-        if pwd_hash == note.password_hash:
+        if _pwd_matches(obj_name, password, note.password_hash):
             note.is_locked = False
-            self.storage.upsert_note_metadata(note)
-            self._notes = self.storage.get_all_notes()
-            return True
+            return self._save_note(note)
         return False
 
     def delete_notes_in_folder(self, folder_name: str) -> List[str]:
         """Bulk deletes all notes in a folder and returns their obj_names."""
-        notes_to_delete = [n for n in self._notes if n.folder == folder_name]
-        obj_names = [n.obj_name for n in notes_to_delete]
-        for obj_name in obj_names:
-            self.storage.delete_note(obj_name)
-        self._notes = self.storage.get_all_notes()
+        if folder_name not in self._notes_by_folder: return []
+        obj_names = self.storage.delete_notes_in_folder(folder_name)
+        if obj_names:
+            deleted = set(obj_names)
+            self._set_notes([n for n in self._notes if n.obj_name not in deleted])
         return obj_names
@@ -1,11 +1,28 @@
 ﻿import os
 import sys
+import logging
+import functools
+from urllib.parse import quote_plus
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QToolBar, QLineEdit, QMenu, QToolButton, QProgressBar)
 from PyQt6.QtGui import QAction, QIcon
 from PyQt6.QtCore import QUrl, Qt, pyqtSignal, QTimer
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineProfile, QWebEngineSettings
 
+_ICONS_ROOT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    "assets", "icons")
+
+# Context-menu icon key -> file (nav keys match QWebEnginePage.WebAction names)
+_MENU_ICON_FILES = {
+    "ai": "ai.svg",
+    "browser": "browser.svg",
+    "search": "search.svg",
+    "Back": "undo.svg",
+    "Forward": "redo.svg",
+    "Reload": "refresh.svg",
+}
+
 class StealthWebView(QWebEngineView):
     def __init__(self, profile_name="default", parent=None):
         super().__init__(parent)
@@ -37,11 +54,38 @@ class StealthWebView(QWebEngineView):
         if hasattr(QWebEngineSettings.WebAttribute, 'MemorySavingsModeEnabled'):
             settings.setAttribute(QWebEngineSettings.WebAttribute.MemorySavingsModeEnabled, True)
 
+        # 4. Custom context-menu actions: built once, re-labelled and re-bound per right-click
+        self._ai_act = QAction(self)
+        self._translate_act = QAction(self)
+        self._search_act = QAction(self)
+
+    @staticmethod
+    def _rebind(act, slot=None):
+        """Drops the previous right-click's handler and connects the new one (if any)."""
+        try:
+            act.triggered.disconnect()
+        except TypeError:
+            pass # Nothing connected yet
+        if slot:
+            act.triggered.connect(slot)
+
+    @classmethod
+    @functools.cache
+    def _icons(cls, is_dark):
+        """Context-menu QIcons for a theme, loaded from disk once (None if the file is missing)."""
+        icon_dir = os.path.join(_ICONS_ROOT, "dark_theme" if is_dark else "light_theme")
+        icons = {}
+        for key, filename in _MENU_ICON_FILES.items():
+            path = os.path.join(icon_dir, filename)
+            icons[key] = QIcon(path) if os.path.exists(path) else None
+        return icons
+
     def contextMenuEvent(self, event):
         menu = self.createStandardContextMenu()
         
         # Get selected text
         selected_text = self.selectedText().strip()
+        query = quote_plus(selected_text) # Escaped once, shared by all three URLs
         
         # Find MainWindow to access DockManager
         main_window = self.window()
@@ -61,55 +105,54 @@ class StealthWebView(QWebEngineView):
         if hasattr(main_window, 'theme_manager'):
             is_dark = main_window.theme_manager.is_dark_mode
         
-        icon_folder = "dark_theme" if is_dark else "light_theme"
-        base_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-        icon_dir = os.path.join(base_path, "assets", "icons", icon_folder)
+        icons = self._icons(is_dark)
         
         # 1. Ask AI Action (Perplexity)
-        ai_act = QAction(f"âœ¨ Ask AI '{display_text}'", self)
-        ai_icon_path = os.path.join(icon_dir, "ai.svg")
-        if os.path.exists(ai_icon_path):
-             ai_act.setIcon(QIcon(ai_icon_path))
-             
+        ai_act = self._ai_act
+        ai_act.setIcon(icons["ai"] or QIcon())
+        ai_act.setEnabled(bool(selected_text))
         if not selected_text:
-             ai_act.setEnabled(False)
              ai_act.setText("âœ¨ Select text to Ask AI")
+             self._rebind(ai_act)
         else:
+             ai_act.setText(f"âœ¨ Ask AI '{display_text}'")
+             ai_slot = None
              if dock_manager:
                 # Using Perplexity for "Search with AI" experience
                 # Changed from /search?q= to /?q= based on user feedback
-                ai_url = f"https://www.perplexity.ai/?q={selected_text}"
-                ai_act.triggered.connect(lambda: dock_manager.add_browser_dock(ai_url))
+                ai_url = f"https://www.perplexity.ai/?q={query}"
+                ai_slot = lambda: dock_manager.add_browser_dock(ai_url)
+             self._rebind(ai_act, ai_slot)
         
         # 2. Translate Action
-        translate_act = QAction(f"Translate '{display_text}'", self)
-        translate_icon_path = os.path.join(icon_dir, "browser.svg") # Use browser icon for translate
-        if os.path.exists(translate_icon_path):
-             translate_act.setIcon(QIcon(translate_icon_path))
-             
+        translate_act = self._translate_act
+        translate_act.setIcon(icons["browser"] or QIcon()) # Use browser icon for translate
+        translate_act.setEnabled(bool(selected_text))
         if not selected_text:
-             translate_act.setEnabled(False)
              translate_act.setText("Select text to Translate")
+             self._rebind(translate_act)
         else:
+             translate_act.setText(f"Translate '{display_text}'")
+             trans_slot = None
              if dock_manager:
-                trans_url = f"https://translate.google.com/?sl=auto&tl=vi&text={selected_text}&op=translate"
-                translate_act.triggered.connect(lambda: dock_manager.add_browser_dock(trans_url))
+                trans_url = f"https://translate.google.com/?sl=auto&tl=vi&text={query}&op=translate"
+                trans_slot = lambda: dock_manager.add_browser_dock(trans_url)
+             self._rebind(translate_act, trans_slot)
         
         # 3. Search Action
-        search_act = QAction(f"Search '{display_text}'", self)
-        search_icon_path = os.path.join(icon_dir, "search.svg")
-        if os.path.exists(search_icon_path):
-             search_act.setIcon(QIcon(search_icon_path))
-
+        search_act = self._search_act
+        search_act.setIcon(icons["search"] or QIcon())
+        search_act.setEnabled(bool(selected_text))
         if not selected_text:
-            search_act.setEnabled(False)
             search_act.setText("Select text to Search")
+            self._rebind(search_act)
         else:
+            search_act.setText(f"Search '{display_text}'")
+            search_url = f"https://www.google.com/search?q={query}"
             if dock_manager:
-                search_url = f"https://www.google.com/search?q={selected_text}"
-                search_act.triggered.connect(lambda: dock_manager.add_browser_dock(search_url))
+                self._rebind(search_act, lambda: dock_manager.add_browser_dock(search_url))
             else:
-                 search_act.triggered.connect(lambda: self.load(QUrl(f"https://www.google.com/search?q={selected_text}")))
+                 self._rebind(search_act, lambda: self.load(QUrl(search_url)))
 
         # --- Standard Actions Refinement ---
         
@@ -123,20 +166,12 @@ class StealthWebView(QWebEngineView):
                     menu.removeAction(act)
 
         # 2. Iconify Standard Navigation
-        nav_icons = {
-            "Back": "undo.svg",
-            "Forward": "redo.svg",
-            "Reload": "refresh.svg"
-        }
-        
-        for attr_name, icon_name in nav_icons.items():
+        for attr_name in ("Back", "Forward", "Reload"):
             if hasattr(QWebEnginePage.WebAction, attr_name):
                 web_act_type = getattr(QWebEnginePage.WebAction, attr_name)
                 act = self.page().action(web_act_type)
-                if act in menu.actions():
-                    path = os.path.join(icon_dir, icon_name)
-                    if os.path.exists(path):
-                        act.setIcon(QIcon(path))
+                if act in menu.actions() and icons[attr_name]:
+                    act.setIcon(icons[attr_name])
 
         # Layout: [Ask AI] [Search] [Translate]
         if first_action:
@@ -229,7 +264,6 @@ class BrowserPane(QWidget):
         self.browser.loadFinished.connect(lambda: self.progress_bar.hide())
         
         # Helper to create buttons
-        from PyQt6.QtWidgets import QToolButton
         def create_btn(text, slot):
             btn = QToolButton()
             btn.setText(text)
@@ -1,6 +1,9 @@
-﻿from PyQt6.QtCore import QObject, pyqtSignal, QMimeData
+﻿from collections import OrderedDict
+from PyQt6.QtCore import Qt, QObject, QTimer, pyqtSignal, QMimeData
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtGui import QImage
+from PyQt6.QtGui import QImage, QPixmap
+
+PREVIEW_SIZE = 64
 
 class ClipboardManager(QObject):
     history_updated = pyqtSignal(list)
@@ -8,25 +11,42 @@ class ClipboardManager(QObject):
     def __init__(self, max_items=20):
         super().__init__()
         self.max_items = max_items
-        self.history = []
+        self._history = OrderedDict() # content key -> item, newest first
+        self._snapshot = [] # List view of _history as last emitted (what the pane shows)
+        self._muted = False # Set while we write to the clipboard ourselves
+        # Bursts of changes (e.g. drag-selecting in a terminal) reach the pane as one update
+        self._emit_timer = QTimer(self)
+        self._emit_timer.setSingleShot(True)
+        self._emit_timer.setInterval(16)
+        self._emit_timer.timeout.connect(self._emit_history)
         self.clipboard = QApplication.clipboard()
         self.clipboard.dataChanged.connect(self.on_clipboard_change)
 
     def on_clipboard_change(self):
+        if self._muted:
+            return
         mime_data = self.clipboard.mimeData()
         
         item = None
+        key = None
         if mime_data.hasImage():
             image = self.clipboard.image()
             if not image.isNull():
+                key = ("image", image.cacheKey())
+                # Scaled once here so the pane never touches the full-size pixels on redraw
+                thumb = image.scaled(PREVIEW_SIZE, PREVIEW_SIZE,
+                                     Qt.AspectRatioMode.KeepAspectRatio,
+                                     Qt.TransformationMode.FastTransformation)
                 item = {
                     "type": "image",
                     "data": image,
-                    "preview": "Image Content"
+                    "preview": "Image Content",
+                    "preview_pixmap": QPixmap.fromImage(thumb)
                 }
         elif mime_data.hasHtml():
             html = mime_data.html()
             text = mime_data.text()
+            key = ("html", html)
             item = {
                 "type": "html",
                 "data": html,
@@ -36,6 +56,7 @@ class ClipboardManager(QObject):
         elif mime_data.hasText():
             text = mime_data.text()
             if text.strip():
+                key = ("text", text)
                 item = {
                     "type": "text",
                     "data": text,
@@ -44,34 +65,73 @@ class ClipboardManager(QObject):
         
         if not item:
             return
+        item["key"] = key
 
-        # [ULTIMATE SAFETY FIX] Defensive comparison using .get("data")
-        new_data = item.get("data")
-        if self.history:
-            prev_data = self.history[0].get("data")
-            if new_data == prev_data:
+        # Same as the newest entry: compare keys first (cacheKey for images, no pixel scan).
+        # A re-fetched image gets a fresh cacheKey, so identical pixels still fall back to QImage ==.
+        if self._history:
+            prev = next(iter(self._history.values()))
+            if prev["key"] == key:
+                return
+            if item["type"] == "image" and prev["type"] == "image" and prev["data"] == item["data"]:
                 return
 
-        # Remove if exists elsewhere for text (prevent spam)
-        if item.get("type") == "text":
-            self.history = [h for h in self.history if h.get("data") != new_data]
-
-        self.history.insert(0, item)
+        # Same content already in history: promote it instead of duplicating (prevent spam)
+        self._history[key] = item
+        self._history.move_to_end(key, last=False)
         
-        if len(self.history) > self.max_items:
-            self.history = self.history[:self.max_items]
+        while len(self._history) > self.max_items:
+            self._history.popitem(last=True)
+
+        self._history_changed()
+
+    def _history_changed(self):
+        if not self._emit_timer.isActive():
+            self._emit_timer.start()
 
-        self.history_updated.emit(self.history)
+    def _emit_history(self):
+        self._snapshot = list(self._history.values())
+        self.history_updated.emit(self._snapshot)
 
     def get_history(self):
-        return self.history
+        return self._snapshot
+
+    def set_clipboard(self, index):
+        """Puts history item `index` back on the system clipboard and moves it to the top.
+        Our own write is not read back (no re-fetch / re-compare of the content)."""
+        if not 0 <= index < len(self._snapshot):
+            return None
+        item = self._snapshot[index]
+
+        mime = QMimeData()
+        if item["type"] == "image":
+            mime.setImageData(item["data"])
+        elif item["type"] == "html":
+            mime.setHtml(item["data"])
+            if "text_fallback" in item:
+                mime.setText(item["text_fallback"])
+        else:
+            mime.setText(item["data"])
+
+        self._muted = True
+        self.clipboard.setMimeData(mime)
+        # dataChanged may be delivered asynchronously on some platforms
+        QTimer.singleShot(0, self._unmute)
+
+        if index and item["key"] in self._history:
+            self._history.move_to_end(item["key"], last=False)
+            self._history_changed()
+        return item
+
+    def _unmute(self):
+        self._muted = False
 
     def remove_item(self, index):
-        """Removes item by index from history."""
-        if 0 <= index < len(self.history):
-            self.history.pop(index)
-            self.history_updated.emit(self.history)
+        """Removes item by index (as shown, i.e. in the last emitted list) from history."""
+        if 0 <= index < len(self._snapshot):
+            self._history.pop(self._snapshot[index]["key"], None)
+            self._history_changed()
 
     def clear_history(self):
-        self.history = []
-        self.history_updated.emit(self.history)
+        self._history.clear()
+        self._history_changed()
@@ -1,5 +1,5 @@
-﻿from PyQt6.QtWidgets import QWidget, QVBoxLayout, QListWidget, QListWidgetItem, QApplication
-from PyQt6.QtCore import Qt, pyqtSignal, QMimeData
+﻿from PyQt6.QtWidgets import QWidget, QVBoxLayout, QListWidget, QListWidgetItem
+from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont, QIcon, QImage
 
 class ClipboardPane(QWidget):
@@ -20,49 +20,55 @@ class ClipboardPane(QWidget):
         self.list_widget.itemClicked.connect(self.on_item_clicked)
         self.layout.addWidget(self.list_widget)
 
-    def update_history(self, history):
-        self.list_widget.clear()
+        self._keys = [] # Content keys of the rows currently shown (row == history index)
+        self._icons = {}
+
+    def _get_icon(self, name):
+        icon = self._icons.get(name)
+        if icon is None:
+            main_window = self.window()
+            if not hasattr(main_window, "_get_icon"):
+                return QIcon()
+            icon = self._icons[name] = main_window._get_icon(name)
+        return icon
+
+    def _make_item(self, item_dict):
+        preview = item_dict.get("preview", "Content")
+        list_item = QListWidgetItem(preview)
         
-        main_window = self.window()
-        def get_icon(name):
-             if hasattr(main_window, "_get_icon"):
-                 return main_window._get_icon(name)
-             return QIcon()
+        # Set icons based on type
+        if item_dict["type"] == "image":
+            thumb = item_dict.get("preview_pixmap")
+            list_item.setIcon(QIcon(thumb) if thumb is not None else self._get_icon("image.svg"))
+            list_item.setText(f" [Image] {preview}")
+        elif item_dict["type"] == "html":
+            list_item.setIcon(self._get_icon("code.svg"))
+        return list_item
 
-        for i, item_dict in enumerate(history):
-            preview = item_dict.get("preview", "Content")
-            list_item = QListWidgetItem(preview)
-            
-            # Set icons based on type
-            if item_dict["type"] == "image":
-                list_item.setIcon(get_icon("image.svg"))
-                list_item.setText(f" [Image] {preview}")
-            elif item_dict["type"] == "html":
-                list_item.setIcon(get_icon("code.svg"))
-            
-            list_item.setData(Qt.ItemDataRole.UserRole, i) # Store index
-            self.list_widget.addItem(list_item)
+    def update_history(self, history):
+        keys = [item_dict["key"] for item_dict in history]
+        old_keys, self._keys = self._keys, keys
+        if keys == old_keys:
+            return
+
+        # Common case: one item captured (or promoted) to the top, the rest shifted down
+        if keys and keys[1:] == old_keys[:len(keys) - 1]:
+            self.list_widget.insertItem(0, self._make_item(history[0]))
+            while self.list_widget.count() > len(keys):
+                self.list_widget.takeItem(self.list_widget.count() - 1)
+            return
+
+        self.list_widget.clear()
+        for item_dict in history:
+            self.list_widget.addItem(self._make_item(item_dict))
 
     def on_item_clicked(self, list_item):
-        idx = list_item.data(Qt.ItemDataRole.UserRole)
+        idx = self.list_widget.row(list_item)
         # Re-inject data into system clipboard for immediate paste
         main_window = self.window()
         if main_window and hasattr(main_window, "clipboard_manager"):
-            history = main_window.clipboard_manager.get_history()
-            if 0 <= idx < len(history):
-                item_dict = history[idx]
-                
-                mime = QMimeData()
-                if item_dict["type"] == "image":
-                    mime.setImageData(item_dict["data"])
-                elif item_dict["type"] == "html":
-                    mime.setHtml(item_dict["data"])
-                    if "text_fallback" in item_dict:
-                        mime.setText(item_dict["text_fallback"])
-                else:
-                    mime.setText(item_dict["data"])
-                
-                QApplication.clipboard().setMimeData(mime)
+            item_dict = main_window.clipboard_manager.set_clipboard(idx)
+            if item_dict is not None:
                 # Also emit for any internal handlers
                 self.item_clicked.emit(item_dict)
 
@@ -71,21 +77,15 @@ class ClipboardPane(QWidget):
         from PyQt6.QtWidgets import QMenu
         from PyQt6.QtGui import QAction
         
-        main_window = self.window()
-        def get_icon(name):
-             if hasattr(main_window, "_get_icon"):
-                 return main_window._get_icon(name)
-             return QIcon()
-
         menu = QMenu(self)
         if item:
-            idx = item.data(Qt.ItemDataRole.UserRole)
-            remove_act = QAction(get_icon("close.svg"), "Remove Item", self)
+            idx = self.list_widget.row(item)
+            remove_act = QAction(self._get_icon("close.svg"), "Remove Item", self)
             remove_act.triggered.connect(lambda: self.item_remove_requested.emit(idx))
             menu.addAction(remove_act)
             menu.addSeparator()
 
-        clear_act = QAction(get_icon("trash.svg"), "Clear All History", self)
+        clear_act = QAction(self._get_icon("trash.svg"), "Clear All History", self)
         clear_act.triggered.connect(lambda: self.clear_all_requested.emit())
         menu.addAction(clear_act)
         
@@ -1,15 +1,24 @@
 ﻿import logging
 import re
-import base64
 import os
+import uuid
 from PyQt6.QtWidgets import QInputDialog, QFileDialog
-from PyQt6.QtGui import QTextCursor, QImage, QTextCharFormat, QTextImageFormat
-from PyQt6.QtCore import Qt, QUrl, QRect, QBuffer, QIODevice
+from PyQt6.QtGui import QTextCursor, QImage, QTextCharFormat, QTextImageFormat, QTextLength
+from PyQt6.QtCore import Qt, QUrl, QRect, QBuffer, QByteArray, QIODevice
+
+from src.ui.style_registry import StyleRegistry
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from src.features.notes.note_pane import NotePane
 
+# <img ...> tags are rewritten in a single pass: size/style constraints dropped,
+# default style injected and embedded base64 sources turned into document resources.
+_IMG_TAG_RE = re.compile(r'<img [^>]*>')
+_IMG_SIZE_ATTR_RE = re.compile(r'\s(?:style|width|height)=["\'][^"\']*["\']')
+_B64_SRC_RE = re.compile(r'src=["\']data:image/(?P<ext>[^;]+);base64,(?P<data>[^"\']+)["\']')
+_SRC_ATTR_RE = re.compile(r'src="([^"]+)"')
+
 class NoteImageManager:
     """
     Component to manage image-related operations for NotePane.
@@ -18,6 +27,81 @@ class NoteImageManager:
     def __init__(self, editor: "NoteEditor"):
         self.editor = editor
         self.doc = editor.document()
+        # resource name -> (QImage.cacheKey(), base64 PNG); skips re-encoding unchanged images on save
+        self._b64_cache = {}
+        # One PNG encode buffer for the manager's lifetime; Truncate rewinds it without freeing its capacity
+        self._png_buffer = QBuffer()
+        self._save_dlg = None # Created on first "Save Image As", then reused (keeps last directory)
+        # Numbers of the blocks holding an image fragment, kept current from contentsChange;
+        # lets hover/click hit-testing skip text-only blocks without touching their fragments
+        self._image_blocks = set()
+        self._block_count = 0
+        self._rescan_image_blocks()
+        # resource name -> QImage; avoids a QUrl + resource-table lookup per hover/save
+        self._res_cache = {}
+        self.doc.contentsChange.connect(self._on_contents_change)
+        self.doc.contentsChanged.connect(self._on_contents_changed)
+
+    def _on_contents_changed(self):
+        self._res_cache.clear()
+
+    @staticmethod
+    def _block_holds_image(block):
+        it = block.begin()
+        while not it.atEnd():
+            fragment = it.fragment()
+            if fragment.isValid() and fragment.charFormat().isImageFormat():
+                return True
+            it += 1
+        return False
+
+    def _rescan_image_blocks(self):
+        self._image_blocks.clear()
+        block = self.doc.begin()
+        while block.isValid():
+            if self._block_holds_image(block):
+                self._image_blocks.add(block.blockNumber())
+            block = block.next()
+        self._block_count = self.doc.blockCount()
+
+    def _on_contents_change(self, position, removed, added):
+        # Only the blocks spanning the edit are re-checked; blocks after it just shift
+        block = self.doc.findBlock(position)
+        last = self.doc.findBlock(position + added)
+        if not last.isValid():
+            last = self.doc.lastBlock()
+        first_num = block.blockNumber()
+        last_num = last.blockNumber()
+        delta = self.doc.blockCount() - self._block_count
+        self._block_count = self.doc.blockCount()
+        if delta:
+            # Old blocks first_num..last_num - delta became first_num..last_num
+            old_last = last_num - delta
+            self._image_blocks = {
+                num if num < first_num else num + delta
+                for num in self._image_blocks if num < first_num or num > old_last
+            }
+        else:
+            self._image_blocks.difference_update(range(first_num, last_num + 1))
+        while block.isValid():
+            if self._block_holds_image(block):
+                self._image_blocks.add(block.blockNumber())
+            if block == last:
+                break
+            block = block.next()
+
+    def has_images(self):
+        """True if any block of the document holds an image."""
+        return bool(self._image_blocks)
+
+    def _get_res(self, name):
+        """Returns the document's image resource for `name` (cached until the next edit)."""
+        image = self._res_cache.get(name)
+        if image is None:
+            image = self.doc.resource(3, QUrl(name))
+            if image and not image.isNull():
+                self._res_cache[name] = image
+        return image
 
     def get_image_at_cursor(self, cursor, pos=None):
         """
@@ -26,17 +110,36 @@ class NoteImageManager:
         """
         target_block = cursor.block()
         blocks_to_search = [target_block]
-        if target_block.previous().isValid(): blocks_to_search.append(target_block.previous())
-        if target_block.next().isValid(): blocks_to_search.append(target_block.next())
+        
+        # With a mouse position, neighbours are only worth scanning when their
+        # geometry (document coords) vertically reaches the pointer.
+        layout = self.doc.documentLayout() if pos else None
+        if layout is not None:
+            doc_y = pos.y() + self.editor.verticalScrollBar().value()
+        for neighbour in (target_block.previous(), target_block.next()):
+            if not neighbour.isValid():
+                continue
+            if layout is not None:
+                rect = layout.blockBoundingRect(neighbour)
+                if not (rect.top() - 5 <= doc_y <= rect.bottom() + 5):
+                    continue
+            blocks_to_search.append(neighbour)
 
+        tl_cursor = None # One measuring cursor, repositioned per image fragment
         for block in blocks_to_search:
+            if block.blockNumber() not in self._image_blocks:
+                continue
             it = block.begin()
             while not it.atEnd():
                 fragment = it.fragment()
-                if fragment.isValid() and fragment.charFormat().isImageFormat():
-                    fmt = fragment.charFormat().toImageFormat()
+                char_fmt = fragment.charFormat() if fragment.isValid() else None
+                if char_fmt is not None and char_fmt.isImageFormat():
+                    if not pos:
+                        return self._select_fragment(fragment)
+                    fmt = char_fmt.toImageFormat()
                     
-                    tl_cursor = QTextCursor(self.doc)
+                    if tl_cursor is None:
+                        tl_cursor = QTextCursor(self.doc)
                     tl_cursor.setPosition(fragment.position())
                     top_left_rect = self.editor.cursorRect(tl_cursor)
                     tl = top_left_rect.topLeft()
@@ -49,7 +152,7 @@ class NoteImageManager:
                     # Without this, image_rect = QRect(x, y, 0, 0) which never
                     # contains any click point â†’ context menu never shows image options.
                     if w <= 0 or h <= 0:
-                        native_img = self.doc.resource(3, QUrl(fmt.name()))
+                        native_img = self._get_res(fmt.name())
                         if native_img and not native_img.isNull():
                             w = native_img.width()
                             h = native_img.height()
@@ -61,25 +164,21 @@ class NoteImageManager:
                     
                     image_rect = QRect(tl.x(), tl.y(), int(w), int(h))
                     
-                    if pos:
-                        if image_rect.adjusted(-5, -5, 5, 5).contains(pos):
-                            img_cursor = QTextCursor(self.doc)
-                            img_cursor.setPosition(fragment.position())
-                            img_cursor.movePosition(QTextCursor.MoveOperation.Right, 
-                                                   QTextCursor.MoveMode.KeepAnchor, 
-                                                   fragment.length())
-                            return img_cursor
-                    else:
-                        img_cursor = QTextCursor(self.doc)
-                        img_cursor.setPosition(fragment.position())
-                        img_cursor.movePosition(QTextCursor.MoveOperation.Right, 
-                                               QTextCursor.MoveMode.KeepAnchor, 
-                                               fragment.length())
-                        return img_cursor
+                    if image_rect.adjusted(-5, -5, 5, 5).contains(pos):
+                        return self._select_fragment(fragment)
                 it += 1
                  
         return None
 
+    def _select_fragment(self, fragment):
+        """Returns a cursor with the given (image) fragment selected."""
+        img_cursor = QTextCursor(self.doc)
+        img_cursor.setPosition(fragment.position())
+        img_cursor.movePosition(QTextCursor.MoveOperation.Right, 
+                               QTextCursor.MoveMode.KeepAnchor, 
+                               fragment.length())
+        return img_cursor
+
 
     def resize_image_dialog(self, cursor):
         """Standardizes image resizing with native ratio support.
@@ -98,7 +197,7 @@ class NoteImageManager:
             
         target_fmt = img_cursor.charFormat().toImageFormat()
         name = target_fmt.name()
-        image_res = self.doc.resource(3, QUrl(name))
+        image_res = self._get_res(name)
         
         native_w = image_res.width() if image_res and not image_res.isNull() else 0
         native_h = image_res.height() if image_res and not image_res.isNull() else 0
@@ -147,66 +246,101 @@ class NoteImageManager:
             
         fmt = img_cursor.charFormat().toImageFormat()
         name = fmt.name()
-        image = self.doc.resource(3, QUrl(name))
+        image = self._get_res(name)
         if image and not image.isNull():
-            file_path, _ = QFileDialog.getSaveFileName(self.editor, "Save Image", "image.png", "Images (*.png *.jpg)")
-            if file_path: image.save(file_path)
+            if self._save_dlg is None:
+                self._save_dlg = QFileDialog(self.editor, "Save Image", "", "Images (*.png *.jpg)")
+                self._save_dlg.setAcceptMode(QFileDialog.AcceptMode.AcceptSave)
+            self._save_dlg.selectFile("image.png")
+            if self._save_dlg.exec():
+                image.save(self._save_dlg.selectedFiles()[0])
+
+    def insert_image(self, image):
+        """Registers `image` as a document resource and inserts it at the editor cursor.
+        No PNG/base64/HTML round-trip; the img_ name is what get_html_with_base64 embeds on save."""
+        # Alpha images are stored premultiplied once, so every repaint takes the painter's fast path
+        if image.hasAlphaChannel() and image.format() != QImage.Format.Format_ARGB32_Premultiplied:
+            image = image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+        name = f"img_{uuid.uuid4().hex}.png"
+        self.doc.addResource(3, QUrl(name), image)
+        fmt = QTextImageFormat()
+        fmt.setName(name)
+        # Same constraint IMAGE_DEFAULT_STYLE gives HTML-inserted images ("max-width: 100%");
+        # its border/radius have no QTextImageFormat equivalent and Qt does not paint them on images.
+        # setMaximumWidth needs Qt 6.8+, older builds keep the native size as before.
+        if hasattr(fmt, "setMaximumWidth"):
+            fmt.setMaximumWidth(QTextLength(QTextLength.Type.PercentageLength, 100))
+        self.editor.textCursor().insertImage(fmt)
 
     def image_to_base64(self, image):
         """Converts QImage to Base64 string."""
-        ba = QBuffer()
-        ba.open(QIODevice.OpenModeFlag.WriteOnly)
-        image.save(ba, "PNG")
-        return base64.b64encode(ba.data().data()).decode('utf-8')
+        buf = self._png_buffer
+        buf.open(QIODevice.OpenModeFlag.WriteOnly | QIODevice.OpenModeFlag.Truncate)
+        image.save(buf, "PNG")
+        buf.close()
+        # Encode on the Qt side: the PNG payload never gets copied into Python bytes
+        return buf.data().toBase64().data().decode('ascii')
 
     def process_html_for_insertion(self, html):
         """Processes HTML by extracting base64 images and adding them as document resources."""
         if "data:image" not in html:
             return html
             
-        # Find base64 image tags
-        pattern = r'src=["\']data:image/(?P<ext>[^;]+);base64,(?P<data>[^"\']+)["\']'
         index_wrapper = [0] # Use list for closure mutability
         
-        # Clean up existing style/size constraints to allow editor to control them
-        html = re.sub(r'(<img[^>]+)style=["\'][^"\']*["\']', r'\1', html)
-        html = re.sub(r'(<img[^>]+)width=["\'][^"\']*["\']', r'\1', html)
-        html = re.sub(r'(<img[^>]+)height=["\'][^"\']*["\']', r'\1', html)
-        
         # Add default style from registry
-        from src.ui.style_registry import StyleRegistry
         # We assume border color comes from theme if we had direct access, 
         # but for now we use the template's default or a fallback
         img_style = StyleRegistry.IMAGE_DEFAULT_STYLE.format(border="#27272a")
-        html = html.replace("<img ", f"<img style='{img_style}' ")
 
         def replace_match(match):
             ext = match.group('ext')
             data_b64 = match.group('data')
             try:
-                img_data = base64.b64decode(data_b64)
+                img_data = QByteArray.fromBase64(data_b64.encode('ascii'))
                 image = QImage.fromData(img_data)
                 if not image.isNull():
                     res_name = f"img_{index_wrapper[0]}.{ext}"
                     self.doc.addResource(3, QUrl(res_name), image)
+                    self._res_cache.pop(res_name, None)
                     index_wrapper[0] += 1
                     return f'src="{res_name}"'
             except Exception as e:
                 logging.error(f"Failed to process embedded image: {e}")
             return match.group(0)
 
-        return re.sub(pattern, replace_match, html)
+        def rewrite_img(match):
+            # Clean up existing style/size constraints to allow editor to control them
+            attrs = _IMG_SIZE_ATTR_RE.sub('', match.group(0)[4:-1])
+            attrs = _B64_SRC_RE.sub(replace_match, attrs)
+            return f"<img style='{img_style}'{attrs}>"
+
+        return _IMG_TAG_RE.sub(rewrite_img, html)
+
+    def get_html_with_base64(self, html, prune=True):
+        """Converts internal resource images back to base64 for saving.
+        `html` is the whole document unless `prune` is False (e.g. a copied selection)."""
+        seen = set()
 
-    def get_html_with_base64(self, html):
-        """Converts internal resource images back to base64 for saving."""
         def replace_src(match):
             src = match.group(1)
             if any(p in src for p in ["img_", "word_img_", "qrc:/"]):
-                 image = self.doc.resource(3, QUrl(src))
+                 seen.add(src)
+                 image = self._get_res(src)
                  if image and not image.isNull():
-                     b64_data = self.image_to_base64(image)
+                     key = image.cacheKey()
+                     cached = self._b64_cache.get(src)
+                     if cached and cached[0] == key:
+                         b64_data = cached[1]
+                     else:
+                         b64_data = self.image_to_base64(image)
+                         self._b64_cache[src] = (key, b64_data)
                      return f'src="data:image/png;base64,{b64_data}"'
             return match.group(0)
 
-        pattern = r'src="([^"]+)"'
-        return re.sub(pattern, replace_src, html)
+        html = _SRC_ATTR_RE.sub(replace_src, html)
+        # Drop encodings of images no longer in the note (e.g. pasted, then deleted)
+        if prune:
+            for src in self._b64_cache.keys() - seen:
+                del self._b64_cache[src]
+        return html
@@ -1,4 +1,5 @@
-﻿from PyQt6.QtWidgets import QListWidget, QListWidgetItem
+﻿from operator import itemgetter
+from PyQt6.QtWidgets import QListWidget, QListWidgetItem
 from PyQt6.QtCore import Qt, pyqtSignal, QPoint
 
 class NoteCompleter(QListWidget):
@@ -20,36 +21,67 @@ class NoteCompleter(QListWidget):
         self.setFixedSize(250, 180)
         self.setObjectName("NoteCompleter")
         
+        # (title_lower, title, note) sorted by title, built once per @ trigger
+        self._index = []
+        self._last_filter = None
+        self._last_matches = []
+        # Rows are updated in place between keystrokes; dropped items wait here for reuse
+        self._shown = [] # index entry shown in each row
+        self._item_pool = []
+        
         # Initial hiding
         self.hide()
 
-    def show_completions(self, pos: QPoint, notes: list, filter_text: str = ""):
-        """Positions and populates the completer."""
-        self.clear()
-        
-        # Filter and sort
-        filtered = []
-        for n in notes:
-            title = n.get("title", "Untitled")
-            if filter_text.lower() in title.lower():
-                filtered.append(n)
+    def set_notes(self, notes: list):
+        """Indexes the candidate notes (lowered + sorted by title) for subsequent filtering."""
+        titles = ((n.get("title", "Untitled"), n) for n in notes)
+        self._index = sorted(((title.lower(), title, n) for title, n in titles), key=itemgetter(0))
+        self._last_filter = None
+        self._last_matches = self._index
+
+    def show_completions(self, pos: QPoint, notes: list = None, filter_text: str = ""):
+        """Positions and populates the completer. Without `notes`, the last indexed set is filtered."""
+        if notes is not None:
+            self.set_notes(notes)
         
-        # Sort by title
-        filtered.sort(key=lambda x: x.get("title", "").lower())
+        # Filter the presorted index; typing more characters only narrows the previous matches
+        needle = filter_text.lower()
+        if self._last_filter is not None and needle.startswith(self._last_filter):
+            candidates = self._last_matches
+        else:
+            candidates = self._index
+        filtered = [entry for entry in candidates if needle in entry[0]] if needle else candidates
+        self._last_filter, self._last_matches = needle, filtered
+        self._sync_rows(filtered)
         
         if not filtered:
             self.hide()
             return
             
-        for n in filtered:
-            item = QListWidgetItem(n.get("title", "Untitled"))
-            item.setData(Qt.ItemDataRole.UserRole, n)
-            self.addItem(item)
-            
         self.setCurrentRow(0)
         self.move(pos)
         self.show()
 
+    def _sync_rows(self, entries):
+        """Makes the rows show `entries`, touching only the rows whose entry changed."""
+        shown = self._shown
+        for row, entry in enumerate(entries):
+            if row < len(shown):
+                if shown[row] is entry:
+                    continue
+                item = self.item(row)
+                shown[row] = entry
+            else:
+                item = self._item_pool.pop() if self._item_pool else QListWidgetItem()
+                self.addItem(item)
+                shown.append(entry)
+            _, title, n = entry
+            item.setText(title)
+            item.setData(Qt.ItemDataRole.UserRole, n)
+        while len(shown) > len(entries):
+            shown.pop()
+            self._item_pool.append(self.takeItem(len(shown)))
+
     def _on_item_clicked(self, item):
         note = item.data(Qt.ItemDataRole.UserRole)
         # Ensure we emit a dict as expected by the signal signature
@@ -1,6 +1,8 @@
 ﻿import logging
 import re
 import os
+import time
+from urllib.parse import quote_plus
 from typing import Dict, Any, cast, Optional
 from PyQt6 import sip
 from PyQt6.QtCore import pyqtSignal, pyqtSlot, Qt, QUrl, QRect, QSize, QTimer, QEvent, QMimeData, QPoint, QMetaObject
@@ -13,6 +15,8 @@ from PyQt6.QtWidgets import QTextEdit, QWidget, QApplication, QFileDialog, QInpu
 from src.features.notes.image_manager import NoteImageManager
 from src.features.notes.paging_engine import NotePagingEngine
 from src.features.notes.note_completer import NoteCompleter
+from src.utils.ui_utils import get_icon
+from src.ui.style_registry import StyleRegistry
 
 class LineNumberArea(QWidget):
     """Gutter widget for painting line numbers."""
@@ -47,23 +51,15 @@ class MinimapArea(QTextEdit):
         
         # 1. Subtle, professional indicator (Notepad++ Style)
         # Represents the visible area; semi-transparent light-gray with a crisp border
+        # (Styled by the app-wide theme sheet via #MinimapIndicator: no per-pane sheet parse)
         self.indicator = QWidget(self.viewport())
-        self.indicator.setStyleSheet("""
-            background-color: rgba(0, 0, 0, 0.05); 
-            border: 1px solid rgba(0, 0, 0, 0.2);
-        """)
+        self.indicator.setObjectName("MinimapIndicator")
         self.indicator.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
         self.indicator.show()
         
         # 2. Minimap Styling: Seamless and subtle
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.NoContextMenu)
         self.setTextInteractionFlags(Qt.TextInteractionFlag.NoTextInteraction)
-        self.setStyleSheet("""
-            QTextEdit {
-                background-color: transparent; 
-                border-left: 1px solid rgba(150, 150, 150, 0.2);
-            }
-        """)
         self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents, False)
         
     def mousePressEvent(self, event):
@@ -103,13 +99,30 @@ class NotePane(QTextEdit):
         super().__init__(parent)
         self.setPlaceholderText("Type notes here... (Paste images supported - Use @ to link notes)")
         self.setMinimumHeight(100) # Prevent massive layout expansion during dock creation
-        self.setMouseTracking(True) 
+        # Hover feedback comes from viewport moves only; QAbstractScrollArea drops move events on its own frame
         self.viewport().setMouseTracking(True)
         self.setAcceptDrops(True)
         self.file_path = None # Tracking the physical file on disk
         self._current_url_highlight: "tuple[int, int] | None" = None 
+        
+        # Hover hit-testing is throttled (~30Hz / 3px); a trailing timer applies the last skipped move
+        self._last_hover_pos: "QPoint | None" = None
+        self._last_hover_ctrl = False
+        self._last_hover_ts = 0.0
+        self._pending_hover = None
+        self._hover_timer = QTimer(self)
+        self._hover_timer.setSingleShot(True)
+        self._hover_timer.setInterval(33)
+        self._hover_timer.timeout.connect(self._apply_pending_hover)
+        self._probe_cache = None # (key, result) of the last _probe; dropped on any edit
+        self._open_image_dlg = None # Created on first use, then reused (keeps last directory/filter)
         self._is_dirty = False # Track if user has modified the content
         
+        # Highlight toggle colours, built once instead of per click
+        self._yellow = QColor("yellow")
+        self._black = QColor("black")
+        self._transparent = QColor(Qt.GlobalColor.transparent)
+        
         # Managers (Plan v12.3: Reduced page size to 250KB for better performance)
         self.paging_engine = NotePagingEngine(self, page_size=250000)
         self.image_manager = NoteImageManager(self)
@@ -119,6 +132,7 @@ class NotePane(QTextEdit):
         self.completer.note_selected.connect(self._insert_note_link)
         
         self.textChanged.connect(self._on_content_modified)
+        self.document().contentsChanged.connect(self._drop_probe_cache)
         self.verticalScrollBar().valueChanged.connect(self.paging_engine.check_scroll)
         self._search_highlight_timer = None
         
@@ -166,20 +180,6 @@ class NotePane(QTextEdit):
         self.cursor_format_changed.emit(self.currentCharFormat())
         self.update_sidebars()
 
-
-
-    def wheelEvent(self, event):
-        """Intercept scroll wheel to dynamically sync zoom across line numbers and minimap."""
-        if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
-            delta = event.angleDelta().y()
-            if delta > 0:
-                self.zoom_in()
-            else:
-                self.zoom_out()
-            event.accept()
-        else:
-            super().wheelEvent(event)
-
     def resizeEvent(self, event):
         super().resizeEvent(event)
         self.update_sidebars_layout()
@@ -654,17 +654,11 @@ class NotePane(QTextEdit):
                  pos_in_block = cursor.positionInBlock()
                  if pos_in_block > at_idx:
                      filter_text = block_text[at_idx+1:pos_in_block].strip()
-                     # Refilter
-                     main_win = self.window()
-                     notes = main_win.note_service.get_notes() if hasattr(main_win, 'note_service') else []
+                     # Refilter the notes indexed when @ was typed
                      # Re-show with updated filter at same pos
                      rect = self.cursorRect()
                      global_pos = self.viewport().mapToGlobal(rect.bottomLeft())
-                     self.completer.show_completions(global_pos, notes, filter_text)
-
-    def insertFromMimeData(self, source: QMimeData):
-        """Standard Rich Text pasting."""
-        super().insertFromMimeData(source)
+                     self.completer.show_completions(global_pos, filter_text=filter_text)
 
     def createMimeDataFromSelection(self) -> QMimeData:
         """
@@ -677,7 +671,7 @@ class NotePane(QTextEdit):
         
         if mime.hasHtml():
             # Process HTML to convert internal IDs to base64
-            portable_html = self.image_manager.get_html_with_base64(mime.html())
+            portable_html = self.image_manager.get_html_with_base64(mime.html(), prune=False)
             mime.setHtml(portable_html)
             
         return mime
@@ -837,7 +831,6 @@ class NotePane(QTextEdit):
         # Qt rigidly embeds the current zoomed font size into the <body style="..."> tag on save.
         # This freezes zooming on restart because the explicit body size overrides the editor's zoom mechanism.
         # We strip font-size from the <body> tag but preserve user's explicit font sizes inside the note.
-        import re
         html = re.sub(r'(<body[^>]*?style="[^"]*?)font-size:\s*\d+(\.\d+)?p[tx];?\s*', r'\1', html, flags=re.IGNORECASE)
 
         processed = self.image_manager.process_html_for_insertion(html)
@@ -866,7 +859,6 @@ class NotePane(QTextEdit):
             # Simple reverse of UniversalReader's nl2br
             text = html.replace("<br>", "\n").replace("<br/>", "\n").replace("<br />", "\n")
             # Strip other HTML tags if it's meant to be plain text
-            import re
             text = re.sub(r'<[^>]+>', '', text)
             return text
         else:
@@ -877,8 +869,6 @@ class NotePane(QTextEdit):
         Robust One-Way Conversion: Renders the current Markdown content into Rich Text.
         Handles massive documents via PagingEngine and avoids cursor-related crashes.
         """
-        from PyQt6.QtWidgets import QApplication
-        from PyQt6.QtCore import Qt
         from src.utils.md_utils import markdown_to_html
         
         # Show Wait Cursor for feedback
@@ -971,7 +961,6 @@ class NotePane(QTextEdit):
         self.moveCursor(QTextCursor.MoveOperation.Start)
         
         # Give UI a moment to render before jumping
-        from PyQt6.QtCore import QTimer
         QTimer.singleShot(20, lambda: self._do_highlight(query, relative_line))
     
     def _do_highlight(self, query, line_number=0):
@@ -1000,7 +989,6 @@ class NotePane(QTextEdit):
 
     def _apply_search_selection(self, cursor):
         """Applies a bright yellow highlight to the given cursor selection."""
-        from src.ui.style_registry import StyleRegistry
         selection = QTextEdit.ExtraSelection()
         selection.format.setBackground(QColor(StyleRegistry.SEARCH_HIGHLIGHT_COLOR))
         selection.format.setForeground(QColor("#000000"))
@@ -1102,7 +1090,7 @@ class NotePane(QTextEdit):
 
 
     def mouseDoubleClickEvent(self, event):
-        if event.button() == Qt.MouseButton.LeftButton:
+        if event.button() == Qt.MouseButton.LeftButton and self.image_manager.has_images():
              # Use precision spatial sensor
              img_cursor = self.image_manager.get_image_at_cursor(self.cursorForPosition(event.pos()), event.pos())
              if img_cursor:
@@ -1112,51 +1100,115 @@ class NotePane(QTextEdit):
 
     def mouseMoveEvent(self, event):
         """Provide visual feedback. ENTERPRISE OPTIMIZATION: Checkboxes hover freely, URLs/Images need CTRL."""
-        # Qt's cursorForPosition often lands *after* a wide character if clicked on its right half.
-        # So we check BOTH the character to the right AND the character to the left.
-        cursor_pos = self.cursorForPosition(event.pos())
+        pos = event.pos()
+        has_ctrl = bool(event.modifiers() & Qt.KeyboardModifier.ControlModifier)
         
-        # Check right side
-        c_right = QTextCursor(cursor_pos)
-        c_right.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.KeepAnchor)
-        char_right = c_right.selectedText()
+        # Pointer barely moved and Ctrl unchanged: the feedback can't have changed
+        if (self._last_hover_pos is not None and has_ctrl == self._last_hover_ctrl
+                and (pos - self._last_hover_pos).manhattanLength() < 3):
+            self._pending_hover = None
+            super().mouseMoveEvent(event)
+            return
+        
+        # Too soon after the last hit-test: defer to the trailing timer (latest position wins)
+        if time.monotonic() - self._last_hover_ts < 1 / 30:
+            self._pending_hover = (pos, has_ctrl)
+            if not self._hover_timer.isActive():
+                self._hover_timer.start()
+            super().mouseMoveEvent(event)
+            return
         
-        # Check left side
-        c_left = QTextCursor(cursor_pos)
-        c_left.movePosition(QTextCursor.MoveOperation.Left, QTextCursor.MoveMode.KeepAnchor)
-        char_left = c_left.selectedText()
+        self._update_hover(pos, has_ctrl)
+        super().mouseMoveEvent(event)
+
+    def _drop_probe_cache(self):
+        self._probe_cache = None
+
+    def changeEvent(self, event):
+        # Zoom (zoomIn/zoomOut), setFont and stylesheet fonts relayout the document
+        # without any contentsChanged; cached hit-tests would point at the old glyphs
+        if event.type() in (QEvent.Type.FontChange, QEvent.Type.StyleChange):
+            self._drop_probe_cache()
+        super().changeEvent(event)
+
+    def _probe(self, pos):
+        """
+        Returns (cursor, checkbox_char, checkbox_cursor) for viewport `pos`.
+        The last result is reused while the position, scroll offsets and wrap width are unchanged.
+        """
+        key = (pos.x(), pos.y(), self.horizontalScrollBar().value(),
+               self.verticalScrollBar().value(), self.viewport().width())
+        if self._probe_cache is not None and self._probe_cache[0] == key:
+            return self._probe_cache[1]
+        
+        # Qt's cursorForPosition often lands *after* a wide character if clicked on its right half.
+        # So we check BOTH the character to the right AND the character to the left.
+        # Characters are read straight from the document; a selecting cursor is only built on a hit.
+        cursor_pos = self.cursorForPosition(pos)
+        doc = self.document()
+        at = cursor_pos.position()
+        char_right = doc.characterAt(at)
+        char_left = doc.characterAt(at - 1) if at > 0 else ""
         
         valid_chars = ["â–¢", "â˜‘", "â˜", "ã€‡", "âœ…"]
-        is_over_checkbox = char_right in valid_chars or char_left in valid_chars
+        if char_right in valid_chars:
+            start, char = at, char_right
+        elif char_left in valid_chars:
+            start, char = at - 1, char_left
+        else:
+            result = (cursor_pos, "", None)
+            self._probe_cache = (key, result)
+            return result
+        
+        char_cursor = QTextCursor(doc)
+        char_cursor.setPosition(start)
+        char_cursor.setPosition(start + 1, QTextCursor.MoveMode.KeepAnchor)
+        result = (cursor_pos, char, char_cursor)
+        self._probe_cache = (key, result)
+        return result
+
+    def _apply_pending_hover(self):
+        if self._pending_hover:
+            self._update_hover(*self._pending_hover)
+
+    def _set_viewport_cursor(self, shape):
+        # Compared against the live shape: QTextEdit itself may switch it (e.g. list markers)
+        viewport = self.viewport()
+        if viewport.cursor().shape() != shape:
+            viewport.setCursor(shape)
+
+    def _update_hover(self, pos, has_ctrl):
+        """Hover hit-testing: cursor shape + URL highlight for the pointer at `pos`."""
+        self._last_hover_pos = QPoint(pos)
+        self._last_hover_ctrl = has_ctrl
+        self._last_hover_ts = time.monotonic()
+        self._pending_hover = None
+        
+        cursor_pos, checkbox_char, _ = self._probe(pos)
         
         # 1. Checkboxes ALWAYS show hand cursor
-        if is_over_checkbox:
-            self.viewport().setCursor(Qt.CursorShape.PointingHandCursor)
+        if checkbox_char:
+            self._set_viewport_cursor(Qt.CursorShape.PointingHandCursor)
             if self._current_url_highlight:
                 self.setExtraSelections([])
                 self._current_url_highlight = None
-            super().mouseMoveEvent(event)
             return
 
-        modifiers = event.modifiers()
-        has_ctrl = (modifiers & Qt.KeyboardModifier.ControlModifier)
-        
         if not has_ctrl:
             if self._current_url_highlight:
                 self.setExtraSelections([])
                 self._current_url_highlight = None
-            self.viewport().setCursor(Qt.CursorShape.IBeamCursor)
-            super().mouseMoveEvent(event)
+            self._set_viewport_cursor(Qt.CursorShape.IBeamCursor)
             return
 
-        # Only reach here if CTRL is held
-        is_over_image = self.image_manager.get_image_at_cursor(cursor_pos, event.pos())
-        url_data = self._get_url_at_pos(event.pos())
+        # Only reach here if CTRL is held (text-only notes skip the image hit-test entirely)
+        is_over_image = self.image_manager.has_images() and self.image_manager.get_image_at_cursor(cursor_pos, pos)
+        url_data = self._get_url_at_pos(pos)
         
         if is_over_image or url_data:
-            self.viewport().setCursor(Qt.CursorShape.PointingHandCursor)
+            self._set_viewport_cursor(Qt.CursorShape.PointingHandCursor)
         else:
-            self.viewport().setCursor(Qt.CursorShape.IBeamCursor)
+            self._set_viewport_cursor(Qt.CursorShape.IBeamCursor)
 
         # Highlight feedback (ExtraSelections)
         if url_data:
@@ -1180,8 +1232,6 @@ class NotePane(QTextEdit):
                 self.setExtraSelections([])
                 self._current_url_highlight = None
 
-        super().mouseMoveEvent(event)
-
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
             # 1. Ctrl + Click URL detection
@@ -1201,34 +1251,17 @@ class NotePane(QTextEdit):
                     if dock_manager:
                         dock_manager.add_browser_dock(url)
                         return # Consume the event
-            # Check for Checkbox Click
-            cursor_pos = self.cursorForPosition(event.pos())
-            
-            # Check right side
-            c_right = QTextCursor(cursor_pos)
-            c_right.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.KeepAnchor)
-            char_right = c_right.selectedText()
-            
-            # Check left side
-            c_left = QTextCursor(cursor_pos)
-            c_left.movePosition(QTextCursor.MoveOperation.Left, QTextCursor.MoveMode.KeepAnchor)
-            char_left = c_left.selectedText()
-            
-            valid_chars = ["â–¢", "â˜‘", "â˜", "ã€‡", "âœ…"]
-            target_char = ""
-            target_cursor = None
-            
-            if char_right in valid_chars:
-                target_char = char_right
-                target_cursor = c_right
-            elif char_left in valid_chars:
-                target_char = char_left
-                target_cursor = c_left
+            # Check for Checkbox Click (usually answered by the hover probe at this position)
+            cursor_pos, target_char, target_cursor = self._probe(event.pos())
             
             if target_char and target_cursor:
                 # Use the perfectly matched Ballot Box pair (U+2610 and U+2611)
                 new_char = "â˜‘" if target_char in ["â–¢", "â˜", "ã€‡"] else "â˜"
                 
+                # One edit block: the toggle, the strikethrough and the checkbox re-format
+                # become a single undo step and a single relayout
+                target_cursor.beginEditBlock()
+                
                 # Insert the new character
                 target_cursor.insertText(new_char)
                 
@@ -1274,6 +1307,7 @@ class NotePane(QTextEdit):
                 
                 checkbox_cursor.mergeCharFormat(cfmt)
                 
+                target_cursor.endEditBlock()
                 return 
 
         super().mousePressEvent(event)
@@ -1284,7 +1318,6 @@ class NotePane(QTextEdit):
         
         main_window = self.window()
         is_dark = getattr(main_window.theme_manager, "is_dark_mode", True) if hasattr(main_window, "theme_manager") else True
-        from src.utils.ui_utils import get_icon
         
         # 1. Clean up & Iconify Standard Actions
         icon_map = {
@@ -1370,18 +1403,19 @@ class NotePane(QTextEdit):
         if selected_text:
             menu.addSeparator()
             dock_manager = getattr(main_window, 'dock_manager', None)
+            query = quote_plus(selected_text) # Escaped once, shared by all three URLs
             
             ai_act = QAction(get_icon("ai.svg", is_dark), "Ask AI", self)
             if dock_manager:
-                ai_act.triggered.connect(lambda: cast(Any, dock_manager).add_browser_dock(f"https://www.perplexity.ai/?q={selected_text}"))
+                ai_act.triggered.connect(lambda: cast(Any, dock_manager).add_browser_dock(f"https://www.perplexity.ai/?q={query}"))
 
             search_act = QAction(get_icon("search.svg", is_dark), "Search on Google", self)
             if dock_manager:
-                search_act.triggered.connect(lambda: cast(Any, dock_manager).add_browser_dock(f"https://www.google.com/search?q={selected_text}"))
+                search_act.triggered.connect(lambda: cast(Any, dock_manager).add_browser_dock(f"https://www.google.com/search?q={query}"))
 
             translate_act = QAction(get_icon("browser.svg", is_dark), "Translate to Vietnamese", self)
             if dock_manager:
-                translate_act.triggered.connect(lambda: cast(Any, dock_manager).add_browser_dock(f"https://translate.google.com/?sl=auto&tl=vi&text={selected_text}&op=translate"))
+                translate_act.triggered.connect(lambda: cast(Any, dock_manager).add_browser_dock(f"https://translate.google.com/?sl=auto&tl=vi&text={query}&op=translate"))
 
             # Insert at top
             actions = menu.actions()
@@ -1391,7 +1425,6 @@ class NotePane(QTextEdit):
             menu.insertSeparator(actions[3])
 
         # 8. Dev Mode Toggle (At the very bottom)
-        from PyQt6.QtWidgets import QApplication
         for w in QApplication.topLevelWidgets():
             # Check by class name to avoid import cycles or type issues
             if type(w).__name__ == 'MainWindow' and hasattr(w, 'menu_manager'):
@@ -1445,6 +1478,17 @@ class NotePane(QTextEdit):
         cursor = self.textCursor()
         fmt = cursor.charFormat()
         
+        # Ask for the table size up front so no modal dialog runs inside the edit block
+        if fmt_type == "table":
+            rows, ok1 = QInputDialog.getInt(self, "Insert Table", "Number of rows:", 3, 1, 50, 1)
+            if not ok1:
+                return
+            cols, ok2 = QInputDialog.getInt(self, "Insert Table", "Number of columns:", 3, 1, 20, 1)
+            if not ok2:
+                return
+        
+        # Whatever the branch writes (formats, list, table, alignment) is one undo step and one relayout
+        cursor.beginEditBlock()
         if fmt_type == "bold":
             fmt.setFontWeight(QFont.Weight.Bold if fmt.fontWeight() != QFont.Weight.Bold else QFont.Weight.Normal)
             cursor.mergeCharFormat(fmt)
@@ -1496,19 +1540,17 @@ class NotePane(QTextEdit):
             fmt.setForeground(QColor("#e0e0e0"))
             cursor.mergeCharFormat(fmt)
         elif fmt_type == "highlight":
-            if fmt.background().color().name() == "#ffff00":
-                fmt.setBackground(Qt.GlobalColor.transparent)
+            # Merge only the highlight colours, not the whole format found at the cursor:
+            # copying every property over the selection multiplies distinct char formats in the document
+            hl_fmt = QTextCharFormat()
+            # RGB compare (alpha ignored, like the former name() == "#ffff00") without building a string
+            if fmt.background().color().rgb() & 0xFFFFFF == self._yellow.rgb() & 0xFFFFFF:
+                hl_fmt.setBackground(self._transparent)
             else:
-                fmt.setBackground(QColor("yellow"))
-                fmt.setForeground(QColor("black"))
-            cursor.mergeCharFormat(fmt)
+                hl_fmt.setBackground(self._yellow)
+                hl_fmt.setForeground(self._black)
+            cursor.mergeCharFormat(hl_fmt)
         elif fmt_type == "table":
-            rows, ok1 = QInputDialog.getInt(self, "Insert Table", "Number of rows:", 3, 1, 50, 1)
-            if not ok1:
-                return
-            cols, ok2 = QInputDialog.getInt(self, "Insert Table", "Number of columns:", 3, 1, 20, 1)
-            if not ok2:
-                return
             # Build table format
             tbl_fmt = QTextTableFormat()
             tbl_fmt.setCellPadding(4)
@@ -1532,6 +1574,7 @@ class NotePane(QTextEdit):
             }
             if fmt_type in mapping:
                 self.apply_alignment(mapping[fmt_type])
+        cursor.endEditBlock()
             
         self.setFocus()
 
@@ -1548,9 +1591,7 @@ class NotePane(QTextEdit):
             image = source.imageData()
             if image:
                 if not isinstance(image, QImage): image = QImage(image)
-                base64_data = self.image_manager.image_to_base64(image)
-                processed_img = self.image_manager.process_html_for_insertion(f'<img src="data:image/png;base64,{base64_data}" />')
-                self.textCursor().insertHtml(processed_img)
+                self.image_manager.insert_image(image)
                 return
 
         # 2. Rich Text (HTML) Sanitization for Native Zoom Support
@@ -1558,7 +1599,6 @@ class NotePane(QTextEdit):
             html = source.html()
             # VS Code and browsers inject rigid font-sizes that break zooming.
             # We strip font-size and line-height but KEEP font-family and colors.
-            import re
             clean_html = re.sub(r'font-size:\s*[^;"]+;?', '', html, flags=re.IGNORECASE)
             clean_html = re.sub(r'line-height:\s*[^;"]+;?', '', clean_html, flags=re.IGNORECASE)
             
@@ -1611,13 +1651,14 @@ class NotePane(QTextEdit):
                 pass
 
     def insert_image_from_file(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Select Image", "", "Images (*.png *.jpg *.jpeg *.bmp *.gif)")
-        if not file_path: return
+        if self._open_image_dlg is None:
+            self._open_image_dlg = QFileDialog(self, "Select Image", "", "Images (*.png *.jpg *.jpeg *.bmp *.gif)")
+            self._open_image_dlg.setFileMode(QFileDialog.FileMode.ExistingFile)
+        if not self._open_image_dlg.exec(): return
+        file_path = self._open_image_dlg.selectedFiles()[0]
         image = QImage(file_path)
         if image.isNull(): return
-        base64_data = self.image_manager.image_to_base64(image)
-        processed_img = self.image_manager.process_html_for_insertion(f'<img src="data:image/png;base64,{base64_data}" />')
-        self.textCursor().insertHtml(processed_img)
+        self.image_manager.insert_image(image)
 
     def get_content_with_embedded_images(self):
         """Exports HTML with images embedded as base64 data URIs."""
@@ -1660,7 +1701,6 @@ class NotePane(QTextEdit):
             pass
 
         # --- Case B: Plain-Text URL Robust Detection (Regex) ---
-        import re
         # Relaxed pattern for common web links
         url_pattern = r'(https?://[^\s<>"]+|www\.[^\s<>"]+|[a-zA-Z0-9.-]+\.(com|net|org|edu|gov|io|vn)/[^\s<>"]*)'
         matches = list(re.finditer(url_pattern, block_text, re.IGNORECASE))
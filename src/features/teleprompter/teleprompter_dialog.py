@@ -1,12 +1,11 @@
 ﻿import logging
 import os
 import re
-import base64
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QTextEdit, QHBoxLayout,
     QPushButton, QSlider, QLabel, QWidget, QFrame, QApplication, QMessageBox
 )
-from PyQt6.QtCore import Qt, QTimer, QSize, QPropertyAnimation, QEasingCurve
+from PyQt6.QtCore import Qt, QTimer, QSize, QPropertyAnimation, QEasingCurve, QByteArray
 from PyQt6.QtGui import QFont, QColor, QIcon, QTextCursor, QTextCharFormat, QImage
 from PyQt6.QtCore import QUrl
 from src.utils.ui_utils import get_icon_dir, get_icon
@@ -372,7 +371,7 @@ class TeleprompterDialog(QDialog):
             ext = match.group('ext')
             data_b64 = match.group('data')
             try:
-                img_data = base64.b64decode(data_b64)
+                img_data = QByteArray.fromBase64(data_b64.encode('ascii'))
                 image = QImage.fromData(img_data)
                 if not image.isNull():
                     res_name = f"pro_img_{index}.{ext}"
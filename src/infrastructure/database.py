@@ -1,6 +1,8 @@
 ﻿import sqlite3
 import os
+import json
 import logging
+from typing import Optional
 from PyQt6.QtCore import QStandardPaths
 
 class DatabaseManager:
@@ -9,10 +11,8 @@ class DatabaseManager:
     Handles connections, schema migrations, and FTS5 initialization.
     """
     def __init__(self, filename="vnnotes.db"):
-        from typing import Optional
         base_path = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
-        if not os.path.exists(base_path):
-            os.makedirs(base_path, exist_ok=True)
+        os.makedirs(base_path, exist_ok=True)
         self.db_path = os.path.join(base_path, filename)
         self.conn: Optional[sqlite3.Connection] = None
         self._init_db()
@@ -30,7 +30,8 @@ class DatabaseManager:
             conn = sqlite3.connect(
                 self.db_path, 
                 check_same_thread=False,
-                isolation_level=None # Autocommit mode, we manage explicit BEGIN/COMMIT
+                isolation_level=None, # Autocommit mode, we manage explicit BEGIN/COMMIT
+                cached_statements=256 # Prepared-statement cache for the storage SQL constants
             )
             conn.row_factory = sqlite3.Row # Dictionary-like cursor results
             
@@ -40,6 +41,7 @@ class DatabaseManager:
             conn.execute("PRAGMA cache_size=-64000;") # 64MB cache
             conn.execute("PRAGMA foreign_keys=ON;")
             conn.execute("PRAGMA temp_store=MEMORY;")
+            conn.execute("PRAGMA mmap_size=268435456;") # 256MB memory-mapped reads
             conn.execute("PRAGMA busy_timeout=5000;") # Wait 5s if locked
             self.conn = conn
             
@@ -207,6 +209,12 @@ class DatabaseManager:
             );
             """)
 
+            # 9. Indexes matching the sidebar / session sort orders
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_notes_order ON notes(pinned DESC, position, id);")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_notes_open_order ON notes(pinned DESC, position, id) WHERE is_open = 1;")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_notes_folder_id ON notes(folder_id);")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_browsers_updated ON browsers(updated_at);")
+
             cursor.execute("COMMIT;")
             logging.info(f"DatabaseManager: Initialized schema at {self.db_path} successfully.")
 
@@ -218,7 +226,6 @@ class DatabaseManager:
 
     def _run_folder_migration(self, cursor):
         """Migrates data from flat folder strings to relational folders table."""
-        import json
         # 1. Normalize Folders: Create records in 'folders' for every unique string in 'notes.folder'
         cursor.execute("SELECT DISTINCT folder FROM notes WHERE folder IS NOT NULL")
         old_folders = [r[0] for r in cursor.fetchall()]
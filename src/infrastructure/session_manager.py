@@ -84,7 +84,7 @@ class SessionManager:
                 # but for auto-save, we can let OS buffer it for performance.
                 # self.ctx.storage.flush()
                 
-                logging.debug(f"Incremental Save: {obj_name}")
+                logging.debug("Incremental Save: %s", obj_name)
         except Exception as e:
             logging.error(f"Failed incremental save for {dock.objectName()}: {e}")
 
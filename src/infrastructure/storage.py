@@ -1,13 +1,145 @@
 import os
+import re
+import hashlib
+import sys
+import string
 import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from typing import List, Dict, Any
-from PyQt6.QtCore import QObject
+from PyQt6.QtCore import QObject, QCoreApplication
 from src.infrastructure.database import DatabaseManager
 from src.domain.interfaces import IStorage
 from src.domain.models import Note, Folder
 from PyQt6 import sip
 from abc import ABCMeta
 
+logger = logging.getLogger(__name__)
+
+# Project root, so the optional legacy `migrate_to_sqlite` script is importable
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
+
+# Search helpers, built once instead of per query / per result row
+_PUNCT_TRANS = str.maketrans('', '', string.punctuation)
+_STRIP_TAGS_RE = re.compile(r'<(?!/?mark>)[^>]+>') # Keep only the FTS5 <mark> highlights
+
+def _content_digest(content):
+    """Compact fingerprint of a note body, for the unchanged-content save skip."""
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+
+def _build_fts_query(query):
+    """'foo, bar' -> '"foo"* AND "bar"*'; None when nothing searchable is left."""
+    words = query.translate(_PUNCT_TRANS).split()
+    if not words:
+        return None
+    if len(words) == 1:
+        return f'"{words[0]}"*'
+    return " AND ".join(f'"{word}"*' for word in words)
+
+def _note_params(note):
+    """Bind parameters for _SQL_UPSERT_NOTE."""
+    return (
+        note.obj_name, note.title, note.folder or "General", 1 if note.pinned else 0, 1 if note.is_open else 0,
+        1 if note.is_locked else 0, 1 if note.is_placeholder else 0, note.password_hash, note.position
+    )
+
+# ── SQL Statements ──────────────────────────────────────────────────
+# Kept as module constants so every call binds the exact same text and
+# hits sqlite3's prepared-statement cache.
+
+# Column order must match Note.from_row; the trailing n.id feeds the obj_name -> id cache
+_SQL_SELECT_NOTES = """
+    SELECT 
+        n.obj_name, n.title, f.name as folder, n.pinned, 
+        n.is_open, n.is_locked, n.is_placeholder, n.password_hash, 
+        n.position, n.id
+    FROM notes n
+    LEFT JOIN folders f ON f.id = n.folder_id
+"""
+
+_SQL_SELECT_NOTE_BY_OBJ_NAME = _SQL_SELECT_NOTES + " WHERE n.obj_name = ?"
+
+_SQL_UPSERT_SETTING = """
+    INSERT INTO app_settings (key, value) VALUES (?, ?)
+    ON CONFLICT(key) DO UPDATE SET value = excluded.value
+"""
+
+_SQL_ENSURE_FOLDER = "INSERT OR IGNORE INTO folders (name) VALUES (?)"
+
+_SQL_UPSERT_NOTE = """
+    INSERT INTO notes (obj_name, title, folder_id, pinned, is_open, is_locked, is_placeholder, password_hash, position)
+    VALUES (?, ?, (SELECT id FROM folders WHERE name = ?), ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(obj_name) DO UPDATE SET
+        title = excluded.title,
+        folder_id = excluded.folder_id,
+        pinned = excluded.pinned,
+        is_open = excluded.is_open,
+        is_locked = excluded.is_locked,
+        is_placeholder = excluded.is_placeholder,
+        password_hash = excluded.password_hash,
+        position = excluded.position,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+_SQL_UPSERT_CONTENT = """
+    INSERT INTO notes_content (note_id, content)
+    SELECT id, ? FROM notes WHERE obj_name = ?
+    ON CONFLICT(note_id) DO UPDATE SET content = excluded.content
+"""
+
+_SQL_TOUCH_NOTE = "UPDATE notes SET updated_at = CURRENT_TIMESTAMP WHERE obj_name = ?"
+
+# Placeholder rows are not part of a folder's visible notes and survive a folder delete
+_SQL_SELECT_FOLDER_NOTES = "SELECT obj_name FROM notes WHERE folder_id = (SELECT id FROM folders WHERE name = ?) AND is_placeholder = 0"
+
+_SQL_DELETE_FOLDER_NOTES = "DELETE FROM notes WHERE folder_id = (SELECT id FROM folders WHERE name = ?) AND is_placeholder = 0"
+
+# Formatted with one "?" per source obj_name (see _SQL_IN_CHUNK)
+_SQL_DELETE_LINKS_FROM = "DELETE FROM note_links WHERE source_id IN (SELECT id FROM notes WHERE obj_name IN ({}))"
+
+_SQL_IN_CHUNK = 500 # Stay well below SQLite's host-parameter limit (999 on older builds)
+
+_SQL_INSERT_LINK = """
+    INSERT OR IGNORE INTO note_links (source_id, target_id)
+    SELECT s.id, t.id FROM notes s, notes t WHERE s.obj_name = ? AND t.obj_name = ?
+"""
+
+_SQL_LOAD_CONTENT = """
+    SELECT c.note_id, c.content FROM notes_content c JOIN notes n ON n.id = c.note_id WHERE n.obj_name = ?
+"""
+
+_SQL_LOAD_CONTENT_BY_ID = "SELECT content FROM notes_content WHERE note_id = ? LIMIT 1"
+
+_SQL_SEARCH_FTS = """
+    WITH fts_matches AS (
+        SELECT 
+            rowid, rank,
+            snippet(notes_fts, 1, '<mark>', '</mark>', '...', 15) as content_snippet
+        FROM notes_fts
+        WHERE notes_fts MATCH ?
+        ORDER BY rank LIMIT 50
+    )
+    SELECT 
+        fm.rowid, n.obj_name, n.title, f.name as folder, n.pinned,
+        fm.content_snippet
+    FROM fts_matches fm
+    JOIN notes n ON n.id = fm.rowid
+    JOIN folders f ON f.id = n.folder_id
+    ORDER BY fm.rank;
+"""
+
+_SQL_UPSERT_BROWSER = """
+    INSERT INTO browsers (obj_name, title, url, updated_at)
+    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(obj_name) DO UPDATE SET
+        title = excluded.title,
+        url = excluded.url,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
 class StorageMeta(sip.wrappertype, ABCMeta):
     """Unified metaclass for QObject and ABCMeta compatibility."""
     pass
@@ -17,247 +149,389 @@ class StorageManager(QObject, IStorage, metaclass=StorageMeta):
     Concrete implementation of IStorage using SQLite.
     Inherits from QObject for signal/slot capabilities.
     """
+    CONTENT_CACHE_CHARS = 8_000_000 # Total size budget of the content LRU
+    CONTENT_CACHE_MAX_ENTRY = 512_000 # Larger bodies (inlined base64 images) are never cached
+    _migrated = False # Legacy migration hook has already run in this process
+
     def __init__(self):
         super().__init__()
         
-        # Auto-Migrate legacy JSON users to SQLite FTS5 silently on startup
-        try:
-            import sys
-            root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            if root_dir not in sys.path:
-                sys.path.insert(0, root_dir)
-            import migrate_to_sqlite
-            migrate_to_sqlite.migrate()
-        except ImportError:
-            pass # Script not found, assuming fresh install or already migrated
-        except Exception as e:
-            logging.error(f"StorageManager: Legacy Migration Hook Failed: {e}")
-            
+        # Auto-Migrate legacy JSON users to SQLite FTS5 silently, once per process
+        if not StorageManager._migrated:
+            try:
+                import migrate_to_sqlite
+                migrate_to_sqlite.migrate()
+            except ImportError:
+                pass # Script not found, assuming fresh install or already migrated
+            except Exception as e:
+                logger.error("StorageManager: Legacy Migration Hook Failed: %s", e)
+            finally:
+                StorageManager._migrated = True
+
         self.db = DatabaseManager()
-        logging.info("StorageManager initialized with SQLite Database Backend.")
+        self._content_cache = OrderedDict() # obj_name -> content (LRU, write-through, size-bounded)
+        self._content_cache_chars = 0
+        self._content_digests = {} # obj_name -> digest of the stored content; drives the unchanged-save skip
+        self._local = threading.local() # Per-thread reusable cursor
+        self._id_cache = {} # obj_name -> notes.id, filled as rows are read
+        self._notes_cache = {} # get_all_notes args -> List[Note], dropped on any metadata write
+        self._notes_cache_lock = threading.RLock()
 
-    def get_all_notes(self, only_open=False, include_placeholders=False):
-        """Fetches notes metadata from the database as a list of Note objects."""
+        # Keep the single connection open for the whole session and release it
+        # (with a WAL checkpoint) only once, when the application shuts down.
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.close)
+        logger.info("StorageManager initialized with SQLite Database Backend.")
+
+    def _cursor(self):
+        """Returns this thread's reusable cursor, recreated if the connection was reopened."""
         conn = self.db.get_connection()
-        cursor = conn.cursor()
+        local = self._local
+        if getattr(local, "conn", None) is not conn:
+            local.conn = conn
+            local.cursor = conn.cursor()
+        return local.cursor
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups several storage calls into one explicit SQLite transaction
+        (a single commit/fsync). Re-entrant: nested use joins the outer one.
+        """
+        cursor = self._cursor()
+        if cursor.connection.in_transaction:
+            yield cursor
+            return
+        cursor.execute("BEGIN IMMEDIATE;")
         try:
-            sql = """
-            SELECT 
-                n.id, n.obj_name, n.title, n.folder_id, n.pinned, 
-                n.is_open, n.is_locked, n.is_placeholder, n.password_hash, 
-                n.position,
-                n.created_at, n.updated_at,
-                f.name as folder 
-            FROM notes n
-            LEFT JOIN folders f ON f.id = n.folder_id
-            """
-            conditions = []
-            if only_open:
-                conditions.append("n.is_open = 1")
-            if not include_placeholders:
-                conditions.append("n.is_placeholder = 0")
-            
-            if conditions:
-                sql += " WHERE " + " AND ".join(conditions)
-            
-            sql += " ORDER BY n.pinned DESC, n.position ASC, n.id ASC"
-            cursor.execute(sql)
-            rows = cursor.fetchall()
-            return [Note.from_dict(dict(row)) for row in rows]
+            yield cursor
+        except Exception:
+            cursor.execute("ROLLBACK;")
+            # Write-through caches may already reflect the rolled-back writes
+            self._content_cache.clear()
+            self._content_cache_chars = 0
+            self._content_digests.clear()
+            self._id_cache.clear()
+            self._invalidate_notes_cache()
+            raise
+        cursor.execute("COMMIT;")
+
+    def _abort_outer_transaction(self):
+        """
+        Called from a write helper's except block: inside a caller's transaction()
+        the error is re-raised so that block ROLLBACKs instead of committing a partial write.
+        """
+        if self._cursor().connection.in_transaction:
+            raise
+
+    @contextmanager
+    def _with_plain_rows(self):
+        """
+        Yields this thread's cursor returning plain tuples instead of sqlite3.Row,
+        for bulk reads that unpack rows by position.
+        """
+        cursor = self._cursor()
+        previous = cursor.row_factory
+        cursor.row_factory = None
+        try:
+            yield cursor
+        finally:
+            cursor.row_factory = previous
+
+    def _notes_query(self, only_open, include_placeholders, limit, offset):
+        """Builds the filtered, ordered note SELECT and its parameters."""
+        sql = _SQL_SELECT_NOTES
+        conditions = []
+        if only_open:
+            conditions.append("n.is_open = 1")
+        if not include_placeholders:
+            conditions.append("n.is_placeholder = 0")
+        
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        
+        sql += " ORDER BY n.pinned DESC, n.position ASC, n.id ASC"
+        params = ()
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = (limit, offset)
+        return sql, params
+
+    def _invalidate_notes_cache(self):
+        with self._notes_cache_lock:
+            self._notes_cache.clear()
+
+    def get_all_notes(self, only_open=False, include_placeholders=False, limit=None, offset=0):
+        """
+        Fetches notes metadata from the database as a list of Note objects (optionally one page).
+        Served from memory until the next metadata mutation.
+        """
+        key = (only_open, include_placeholders, limit, offset)
+        try:
+            with self._notes_cache_lock:
+                cached = self._notes_cache.get(key)
+                if cached is not None:
+                    return list(cached)
+                with self._with_plain_rows() as cursor:
+                    cursor.execute(*self._notes_query(only_open, include_placeholders, limit, offset))
+                    rows = cursor.fetchall()
+                notes = [Note.from_row(row) for row in rows]
+                self._id_cache.update((row[0], row[9]) for row in rows)
+                self._notes_cache[key] = notes
+                return list(notes)
         except Exception as e:
-            logging.error(f"StorageManager.get_all_notes Error: {e}")
+            logger.error("StorageManager.get_all_notes Error: %s", e)
             return []
 
+    def iter_all_notes(self, only_open=False, include_placeholders=False, batch_size=256):
+        """Yields Note objects in fetchmany() batches instead of materializing the whole table."""
+        # Own cursor: the shared per-thread one may be reused while the caller iterates
+        cursor = self.db.get_connection().cursor()
+        cursor.row_factory = None
+        try:
+            cursor.execute(*self._notes_query(only_open, include_placeholders, None, 0))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield Note.from_row(row)
+        except Exception as e:
+            logger.error("StorageManager.iter_all_notes Error: %s", e)
+        finally:
+            cursor.close()
+
     def get_note_by_obj_name(self, obj_name):
         """Fetches a single note by object name."""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        cursor = self._cursor()
         try:
-            cursor.execute("""
-                SELECT 
-                    n.id, n.obj_name, n.title, n.folder_id, n.pinned, 
-                    n.is_open, n.is_locked, n.is_placeholder, n.password_hash, 
-                    n.created_at, n.updated_at,
-                    f.name as folder 
-                FROM notes n
-                LEFT JOIN folders f ON f.id = n.folder_id
-                WHERE n.obj_name = ?
-            """, (obj_name,))
+            cursor.execute(_SQL_SELECT_NOTE_BY_OBJ_NAME, (obj_name,))
             row = cursor.fetchone()
-            return Note.from_dict(dict(row)) if row else None
+            if not row:
+                return None
+            self._id_cache[row[0]] = row[9]
+            return Note.from_row(row)
         except Exception as e:
-            logging.error(f"StorageManager.get_note_by_obj_name Error: {e}")
+            logger.error("StorageManager.get_note_by_obj_name Error: %s", e)
             return None
 
     def upsert_note_metadata(self, note: Note):
         """Inserts or updates note metadata using a Note model."""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        self._invalidate_notes_cache()
         try:
-            cursor.execute("BEGIN;")
-            
-            # Resolve Folder ID
-            folder_name = note.folder or "General"
-            cursor.execute("INSERT OR IGNORE INTO folders (name) VALUES (?)", (folder_name,))
-            cursor.execute("SELECT id FROM folders WHERE name = ?", (folder_name,))
-            folder_id = cursor.fetchone()[0]
-
-            # Check if exists
-            cursor.execute("SELECT id FROM notes WHERE obj_name = ?", (note.obj_name,))
-            existing = cursor.fetchone()
-
-            if existing: # Update
-                cursor.execute("""
-                    UPDATE notes 
-                    SET title = ?, folder_id = ?, pinned = ?, is_open = ?, is_locked = ?, is_placeholder = ?, password_hash = ?, position = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE obj_name = ?
-                """, (note.title, folder_id, 1 if note.pinned else 0, 1 if note.is_open else 0, 
-                      1 if note.is_locked else 0, 1 if note.is_placeholder else 0, note.password_hash, note.position, note.obj_name))
-            else: # Insert
-                cursor.execute("""
-                    INSERT INTO notes (obj_name, title, folder_id, pinned, is_open, is_locked, is_placeholder, password_hash, position)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (note.obj_name, note.title, folder_id, 1 if note.pinned else 0, 1 if note.is_open else 0, 
-                      1 if note.is_locked else 0, 1 if note.is_placeholder else 0, note.password_hash, note.position))
-            
-            cursor.execute("COMMIT;")
+            with self.transaction() as cursor:
+                # Resolve Folder ID
+                cursor.execute(_SQL_ENSURE_FOLDER, (note.folder or "General",))
+                cursor.execute(_SQL_UPSERT_NOTE, _note_params(note))
+            return True
+        except Exception as e:
+            logger.error("StorageManager.upsert_note_metadata Error: %s", e)
+            return False
+
+    def upsert_notes_metadata_bulk(self, notes: List[Note]):
+        """Upserts many Note models in one transaction via executemany."""
+        if not notes:
+            return True
+        self._invalidate_notes_cache()
+        try:
+            with self.transaction() as cursor:
+                cursor.executemany(_SQL_ENSURE_FOLDER, [(name,) for name in {n.folder or "General" for n in notes}])
+                cursor.executemany(_SQL_UPSERT_NOTE, [_note_params(n) for n in notes])
             return True
         except Exception as e:
-            conn.execute("ROLLBACK;")
-            logging.error(f"StorageManager.upsert_note_metadata Error: {e}")
+            logger.error("StorageManager.upsert_notes_metadata_bulk Error: %s", e)
+            self._abort_outer_transaction()
             return False
 
     def get_app_setting(self, key, default_value=None):
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        cursor = self._cursor()
         try:
             cursor.execute("SELECT value FROM app_settings WHERE key = ?", (key,))
             row = cursor.fetchone()
             return row["value"] if row else default_value
         except Exception as e:
-            logging.error(f"StorageManager.get_app_setting Error: {e}")
+            logger.error("StorageManager.get_app_setting Error: %s", e)
             return default_value
 
     def set_app_setting(self, key, value):
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        cursor = self._cursor()
         try:
-            cursor.execute("SELECT 1 FROM app_settings WHERE key = ?", (key,))
-            if cursor.fetchone():
-                cursor.execute("UPDATE app_settings SET value = ? WHERE key = ?", (value, key))
-            else:
-                cursor.execute("INSERT INTO app_settings (key, value) VALUES (?, ?)", (key, value))
+            cursor.execute(_SQL_UPSERT_SETTING, (key, value))
             return True
         except Exception as e:
-            logging.error(f"StorageManager.set_app_setting Error: {e}")
+            logger.error("StorageManager.set_app_setting Error: %s", e)
             return False
 
     def delete_note(self, obj_name):
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        self._invalidate_notes_cache()
+        cursor = self._cursor()
         try:
             cursor.execute("DELETE FROM notes WHERE obj_name = ?", (obj_name,))
+            self._forget_content(obj_name)
+            self._id_cache.pop(obj_name, None)
             return True
         except Exception as e:
-            logging.error(f"StorageManager.delete_note Error: {e}")
+            logger.error("StorageManager.delete_note Error: %s", e)
             return False
 
+    def delete_notes_in_folder(self, folder_name):
+        """Deletes every note in a folder with one DELETE; returns the removed obj_names."""
+        self._invalidate_notes_cache()
+        try:
+            with self.transaction() as cursor:
+                cursor.execute(_SQL_SELECT_FOLDER_NOTES, (folder_name,))
+                obj_names = [row[0] for row in cursor.fetchall()]
+                if obj_names:
+                    # Content rows cascade, and their FTS5 entries follow via the notes_ad trigger
+                    cursor.execute(_SQL_DELETE_FOLDER_NOTES, (folder_name,))
+            for obj_name in obj_names:
+                self._forget_content(obj_name)
+                self._id_cache.pop(obj_name, None)
+            return obj_names
+        except Exception as e:
+            logger.error("StorageManager.delete_notes_in_folder Error: %s", e)
+            return []
+
     def save_note_content(self, obj_name, content):
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        # Fast path: autosave re-submits every open note; skip the write (and
+        # the FTS5 trigger work) when the content matches what is already stored.
+        digest = _content_digest(content)
+        if self._content_digests.get(obj_name) == digest:
+            return True
+
         try:
-            cursor.execute("BEGIN;")
-            cursor.execute("SELECT id FROM notes WHERE obj_name = ?", (obj_name,))
-            note_row = cursor.fetchone()
-            if not note_row:
-                cursor.execute("ROLLBACK;")
-                return False
-            note_id = note_row[0]
-
-            cursor.execute("SELECT 1 FROM notes_content WHERE note_id = ?", (note_id,))
-            if cursor.fetchone():
-                cursor.execute("UPDATE notes_content SET content = ? WHERE note_id = ?", (content, note_id))
-            else:
-                cursor.execute("INSERT INTO notes_content (note_id, content) VALUES (?, ?)", (note_id, content))
-                
-            cursor.execute("UPDATE notes SET updated_at = CURRENT_TIMESTAMP WHERE id = ?", (note_id,))
-            cursor.execute("COMMIT;")
+            with self.transaction() as cursor:
+                cursor.execute(_SQL_UPSERT_CONTENT, (content, obj_name))
+                if cursor.rowcount == 0:
+                    return False # Unknown note: nothing was written
+                cursor.execute(_SQL_TOUCH_NOTE, (obj_name,))
+            self._cache_content(obj_name, content, digest)
+            return True
+        except Exception as e:
+            logger.error("StorageManager.save_note_content Error: %s", e)
+            return False
+
+    def save_note_contents_bulk(self, items: List[tuple]):
+        """Saves many (obj_name, content) pairs in one transaction, skipping unchanged ones."""
+        changed, digests = [], []
+        for obj_name, content in items:
+            digest = _content_digest(content)
+            if self._content_digests.get(obj_name) != digest:
+                changed.append((content, obj_name))
+                digests.append(digest)
+        if not changed:
+            return True
+        try:
+            with self.transaction() as cursor:
+                cursor.executemany(_SQL_UPSERT_CONTENT, changed)
+                if cursor.rowcount != len(changed):
+                    raise LookupError("unknown note, content not written")
+                cursor.executemany(_SQL_TOUCH_NOTE, [(obj_name,) for _, obj_name in changed])
+            for (content, obj_name), digest in zip(changed, digests):
+                self._cache_content(obj_name, content, digest)
             return True
         except Exception as e:
-            conn.execute("ROLLBACK;")
-            logging.error(f"StorageManager.save_note_content Error: {e}")
+            logger.error("StorageManager.save_note_contents_bulk Error: %s", e)
+            self._abort_outer_transaction()
             return False
 
     def load_note_content(self, obj_name):
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        cached = self._content_cache.get(obj_name)
+        if cached is not None:
+            self._content_cache.move_to_end(obj_name)
+            return cached
+
+        cursor = self._cursor()
         try:
-            cursor.execute("""
-                SELECT c.content FROM notes_content c JOIN notes n ON n.id = c.note_id WHERE n.obj_name = ?
-            """, (obj_name,))
+            note_id = self._id_cache.get(obj_name)
+            if note_id is not None:
+                # Known id: single primary-key probe on notes_content, no join
+                cursor.execute(_SQL_LOAD_CONTENT_BY_ID, (note_id,))
+            else:
+                cursor.execute(_SQL_LOAD_CONTENT, (obj_name,))
             row = cursor.fetchone()
-            return row['content'] if row and row['content'] else ""
+            if row and note_id is None:
+                self._id_cache[obj_name] = row['note_id']
+            content = row['content'] if row and row['content'] else ""
+            self._cache_content(obj_name, content)
+            return content
         except Exception as e:
-            logging.error(f"StorageManager.load_note_content Error: {e}")
+            logger.error("StorageManager.load_note_content Error: %s", e)
             return ""
 
+    def _cache_content(self, obj_name, content, digest=None):
+        """
+        Records the stored content's digest and keeps the body in the LRU, evicting the
+        least recently used notes once CONTENT_CACHE_CHARS is exceeded. Bodies over
+        CONTENT_CACHE_MAX_ENTRY are not kept; they are already held by their open editor.
+        """
+        self._content_digests[obj_name] = digest or _content_digest(content)
+        cache = self._content_cache
+        old = cache.pop(obj_name, None)
+        if old is not None:
+            self._content_cache_chars -= len(old)
+        if len(content) > self.CONTENT_CACHE_MAX_ENTRY:
+            return
+        cache[obj_name] = content
+        self._content_cache_chars += len(content)
+        while self._content_cache_chars > self.CONTENT_CACHE_CHARS:
+            _, evicted = cache.popitem(last=False)
+            self._content_cache_chars -= len(evicted)
+
+    def _forget_content(self, obj_name):
+        self._content_digests.pop(obj_name, None)
+        old = self._content_cache.pop(obj_name, None)
+        if old is not None:
+            self._content_cache_chars -= len(old)
+
     def get_folders(self):
         """Retrieves all folders as Folder objects."""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        cursor = self._cursor()
         try:
             cursor.execute("SELECT * FROM folders ORDER BY name ASC")
             rows = cursor.fetchall()
             return [Folder.from_dict(dict(row)) for row in rows]
         except Exception as e:
-            logging.error(f"StorageManager.get_folders Error: {e}")
+            logger.error("StorageManager.get_folders Error: %s", e)
             return []
 
     def rename_folder(self, old_name, new_name):
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        self._invalidate_notes_cache() # Notes report their folder by name
+        cursor = self._cursor()
         try:
             cursor.execute("UPDATE folders SET name = ? WHERE name = ?", (new_name, old_name))
             return True
         except Exception as e:
-            logging.error(f"StorageManager.rename_folder Error: {e}")
+            logger.error("StorageManager.rename_folder Error: %s", e)
             return False
 
     def set_folder_lock(self, name, is_locked, password_hash=None):
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        cursor = self._cursor()
         try:
             cursor.execute("""
                 UPDATE folders SET is_locked = ?, password_hash = ? WHERE name = ?
             """, (1 if is_locked else 0, password_hash, name))
             return True
         except Exception as e:
-            logging.error(f"StorageManager.set_folder_lock Error: {e}")
+            logger.error("StorageManager.set_folder_lock Error: %s", e)
             return False
 
     def search_notes_fts(self, query):
         """FTS5 search, return data formatted for UI integration."""
         query = query.strip()
         if not query: return []
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        import string
-        words = query.translate(str.maketrans('', '', string.punctuation)).split()
-        if not words: return []
-        fts_query = " AND ".join(f'"{word}"*' for word in words if word)
+        fts_query = _build_fts_query(query)
+        if fts_query is None:
+            logger.debug("StorageManager FTS5 Search: nothing searchable in %r", query)
+            return []
+        cursor = self._cursor()
+        needle = query.lower()
         
         try:
-            sql = """
-            SELECT 
-                fts.rowid, n.obj_name, n.title, f.name as folder, n.pinned,
-                snippet(notes_fts, 1, '<mark>', '</mark>', '...', 15) as content_snippet
-            FROM notes_fts fts
-            JOIN notes n ON n.id = fts.rowid
-            JOIN folders f ON f.id = n.folder_id
-            WHERE notes_fts MATCH ?
-            ORDER BY rank LIMIT 50;
-            """
-            cursor.execute(sql, (fts_query,))
+            # Resolve the MATCH (and its snippets) against the FTS5 index first,
+            # bounded to 50 candidates, and only then join the metadata tables.
+            cursor.execute(_SQL_SEARCH_FTS, (fts_query,))
             rows = cursor.fetchall()
             
             matches = []
@@ -269,18 +543,17 @@ class StorageManager(QObject, IStorage, metaclass=StorageMeta):
                     "pinned": bool(row["pinned"])
                 }
                 note_matches = []
-                if query.lower() in row["title"].lower():
+                if needle in row["title"].lower():
                     note_matches.append({"type": "title", "text": row["title"]})
                 if row["content_snippet"]:
-                    import re
-                    clean_snippet = re.sub(r'<(?!/?mark>)[^>]+>', '', row["content_snippet"])
+                    clean_snippet = _STRIP_TAGS_RE.sub('', row["content_snippet"])
                     note_matches.append({"type": "content", "line": 0, "text": clean_snippet})
                 
                 if note_matches:
                     matches.append({"note": note_data, "matches": note_matches})
             return matches
         except Exception as e:
-            logging.error(f"StorageManager FTS5 Search Error: {e}")
+            logger.error("StorageManager FTS5 Search Error: %s", e)
             return []
 
     def save_to_disk(self):
@@ -291,73 +564,112 @@ class StorageManager(QObject, IStorage, metaclass=StorageMeta):
         """Satisfy SessionManager's call to flush. Same as save_to_disk for SQLite."""
         self.save_to_disk()
 
+    def close(self):
+        """Checkpoints the WAL and closes the persistent connection on shutdown."""
+        try:
+            self.db.close()
+        except Exception as e:
+            logger.error("StorageManager.close Error: %s", e)
+
     # â”€â”€ Non-Interface Helper Methods â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€
 
     def set_all_notes_closed(self):
-        conn = self.db.get_connection()
+        """Marks every open note closed; returns how many rows changed (0 = nothing was open)."""
+        cursor = self._cursor()
         try:
-            conn.execute("UPDATE notes SET is_open = 0")
-            return True
+            # Only rewrite rows that are actually open (walks idx_notes_open_order)
+            cursor.execute("UPDATE notes SET is_open = 0 WHERE is_open = 1")
+            if cursor.rowcount:
+                self._invalidate_notes_cache()
+            return cursor.rowcount
         except Exception as e:
-            logging.error(f"StorageManager.set_all_notes_closed Error: {e}")
+            logger.error("StorageManager.set_all_notes_closed Error: %s", e)
+            self._abort_outer_transaction()
             return False
 
     def update_note_links(self, source_obj_name, target_obj_names):
-        conn = self.db.get_connection()
         try:
-            conn.execute("BEGIN;")
-            cursor = conn.cursor()
-            cursor.execute("SELECT id FROM notes WHERE obj_name = ?", (source_obj_name,))
-            source_row = cursor.fetchone()
-            if not source_row:
-                conn.execute("ROLLBACK;")
-                return False
-            source_id = source_row[0]
-            conn.execute("DELETE FROM note_links WHERE source_id = ?", (source_id,))
-            for t_obj_name in target_obj_names:
-                cursor.execute("SELECT id FROM notes WHERE obj_name = ?", (t_obj_name,))
-                target_row = cursor.fetchone()
-                if target_row:
-                    conn.execute("INSERT OR IGNORE INTO note_links (source_id, target_id) VALUES (?, ?)", (source_id, target_row[0]))
-            conn.execute("COMMIT;")
+            with self.transaction() as cursor:
+                cursor.execute("SELECT id FROM notes WHERE obj_name = ?", (source_obj_name,))
+                source_row = cursor.fetchone()
+                if not source_row:
+                    return False
+                source_id = source_row[0]
+                cursor.execute("DELETE FROM note_links WHERE source_id = ?", (source_id,))
+                for t_obj_name in target_obj_names:
+                    cursor.execute("SELECT id FROM notes WHERE obj_name = ?", (t_obj_name,))
+                    target_row = cursor.fetchone()
+                    if target_row:
+                        cursor.execute("INSERT OR IGNORE INTO note_links (source_id, target_id) VALUES (?, ?)", (source_id, target_row[0]))
+            return True
+        except Exception as e:
+            logger.error("StorageManager.update_note_links Error: %s", e)
+            return False
+
+    def update_note_links_bulk(self, links: Dict[str, List[str]]):
+        """Replaces the outgoing links of many notes ({source: [targets]}) in one transaction."""
+        if not links:
+            return True
+        try:
+            with self.transaction() as cursor:
+                sources = list(links)
+                for i in range(0, len(sources), _SQL_IN_CHUNK):
+                    chunk = sources[i:i + _SQL_IN_CHUNK]
+                    cursor.execute(_SQL_DELETE_LINKS_FROM.format(",".join("?" * len(chunk))), chunk)
+                cursor.executemany(_SQL_INSERT_LINK, [
+                    (source, target) for source, targets in links.items() for target in targets
+                ])
             return True
         except Exception as e:
-            conn.execute("ROLLBACK;")
-            logging.error(f"StorageManager.update_note_links Error: {e}")
+            logger.error("StorageManager.update_note_links_bulk Error: %s", e)
+            self._abort_outer_transaction()
             return False
 
     def get_all_browsers(self) -> List[Dict[str, Any]]:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
         try:
-            cursor.execute("SELECT obj_name, title, url FROM browsers ORDER BY updated_at DESC")
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            with self._with_plain_rows() as cursor:
+                cursor.execute("SELECT obj_name, title, url FROM browsers ORDER BY updated_at DESC")
+                rows = cursor.fetchall()
+            return [{"obj_name": obj_name, "title": title, "url": url} for obj_name, title, url in rows]
         except Exception as e:
-            logging.error(f"StorageManager.get_all_browsers Error: {e}")
+            logger.error("StorageManager.get_all_browsers Error: %s", e)
             return []
 
     def delete_all_browsers(self) -> bool:
-        conn = self.db.get_connection()
+        cursor = self._cursor()
+        try:
+            cursor.execute("DELETE FROM browsers")
+            return True
+        except Exception as e:
+            logger.error("StorageManager.delete_all_browsers Error: %s", e)
+            return False
+
+    def delete_browsers(self, obj_names: List[str]) -> bool:
+        cursor = self._cursor()
         try:
-            conn.execute("DELETE FROM browsers")
+            cursor.executemany("DELETE FROM browsers WHERE obj_name = ?", [(n,) for n in obj_names])
             return True
         except Exception as e:
-            logging.error(f"StorageManager.delete_all_browsers Error: {e}")
+            logger.error("StorageManager.delete_browsers Error: %s", e)
+            self._abort_outer_transaction()
             return False
 
     def upsert_browser_metadata(self, browser: Dict[str, Any]) -> bool:
-        conn = self.db.get_connection()
+        cursor = self._cursor()
+        try:
+            cursor.execute(_SQL_UPSERT_BROWSER, (browser["obj_name"], browser["title"], browser["url"]))
+            return True
+        except Exception as e:
+            logger.error("StorageManager.upsert_browser_metadata Error: %s", e)
+            return False
+
+    def bulk_insert_browsers(self, rows: List[tuple]) -> bool:
+        """Writes many (obj_name, title, url) rows with a single executemany."""
+        cursor = self._cursor()
         try:
-            conn.execute("""
-                INSERT INTO browsers (obj_name, title, url, updated_at)
-                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-                ON CONFLICT(obj_name) DO UPDATE SET
-                    title = excluded.title,
-                    url = excluded.url,
-                    updated_at = CURRENT_TIMESTAMP
-            """, (browser["obj_name"], browser["title"], browser["url"]))
+            cursor.executemany(_SQL_UPSERT_BROWSER, rows)
             return True
         except Exception as e:
-            logging.error(f"StorageManager.upsert_browser_metadata Error: {e}")
+            logger.error("StorageManager.bulk_insert_browsers Error: %s", e)
+            self._abort_outer_transaction()
             return False
@@ -207,7 +207,7 @@ class MainWindow(QMainWindow):
         self._sidebar_watchdog.timeout.connect(self._check_sidebar_release_watchdog)
 
         # Check for updates
-        # QTimer.singleShot(3000, lambda: self.check_for_updates(manual=False))
+        # QTimer.singleShot(3000, lambda: self.check_for_updates(manual=False, use_cache=True))
 
         # Senior Fix: Delayed stability check for Sidebar width
         # This fixes the "Startup Glitch" where the sidebar restores to a near-0 width.
@@ -1407,8 +1407,8 @@ class MainWindow(QMainWindow):
     def open_teleprompter(self):
         self.dialog_manager.open_teleprompter()
 
-    def check_for_updates(self, manual=True):
-        self.dialog_manager.check_for_updates(manual)
+    def check_for_updates(self, manual=True, use_cache=False):
+        self.dialog_manager.check_for_updates(manual, use_cache)
 
     def rename_active_note(self):
         self.dialog_manager.rename_active_note()
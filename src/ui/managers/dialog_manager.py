@@ -5,7 +5,7 @@ from PyQt6.QtWidgets import QMessageBox, QFileDialog, QDockWidget
 from PyQt6 import sip
 
 from src.infrastructure.reader import UniversalReader
-from src.core.version import check_for_updates, CURRENT_VERSION
+from src.core.version import check_for_updates_async, CURRENT_VERSION
 
 logger = logging.getLogger(__name__)
 
@@ -128,9 +128,17 @@ class DialogManager:
         self.mw.teleprompter = TeleprompterDialog(content, theme_config=theme_config)
         self.mw.teleprompter.show()
 
-    def check_for_updates(self, manual=True):
-        """Checks for updates and reports results."""
-        has_update, latest_version, url, error = check_for_updates()
+    def check_for_updates(self, manual=True, use_cache=False):
+        """Checks for updates in the background and reports results.
+        `use_cache` (startup check only) may answer from the last result within its TTL;
+        otherwise the release is always revalidated (ETag)."""
+        check_for_updates_async(
+            lambda *result: self._on_update_checked(manual, *result),
+            use_cache=use_cache)
+
+    def _on_update_checked(self, manual, has_update, latest_version, url, error):
+        if sip.isdeleted(self.mw):
+            return
         if has_update:
             msg = (f"<b>VNNotes v{latest_version} is available!</b><br><br>"
                    f"Download now at:<br><a href='{url}'>{url}</a>")
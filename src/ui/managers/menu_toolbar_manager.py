@@ -158,7 +158,8 @@ class MenuToolbarManager:
         
         update_act = QAction(self._icon("refresh.svg"), "Check for Updates", self.main_window)
         update_act._icon_name = "refresh.svg"
-        update_act.triggered.connect(self.main_window.check_for_updates)
+        # Lambda: triggered(bool) would otherwise land in `manual` as False
+        update_act.triggered.connect(lambda: self.main_window.check_for_updates(manual=True))
         self.actions["update"] = update_act
         
         about_act = QAction(self._icon("note.svg"), "About VNNotes", self.main_window)
@@ -279,6 +279,16 @@ class ThemeManager(QObject):
                 selection-background-color: {c['accent']};
             }}
 
+            /* Editor minimap (one per NotePane), styled here once instead of a sheet per pane */
+            QTextEdit#EditorMinimap {{
+                background-color: transparent; 
+                border-left: 1px solid rgba(150, 150, 150, 0.2);
+            }}
+            QWidget#MinimapIndicator {{
+                background-color: rgba(0, 0, 0, 0.05); 
+                border: 1px solid rgba(0, 0, 0, 0.2);
+            }}
+
             QToolBar {{ 
                 background: {c['surface']}; 
                 border-bottom: 1px solid {c['border']}; 